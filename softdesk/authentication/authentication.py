@@ -0,0 +1,37 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from . import usercache
+
+
+TOKEN_REVOKED = "Ce jeton a été révoqué, veuillez vous reconnecter."
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication serving request.user from the user cache instead of loading it for every request.
+    The user is read from the database on a cache miss, or when the token version of the cache differs
+    from the token's, which is then rejected if the database confirms it was revoked.
+    Tokens without a version (issued before) always load the user.
+    """
+
+    def get_user(self, validated_token):
+        token_version = validated_token.get("token_version")
+        if token_version is None:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Le jeton ne contient pas d'identifiant d'utilisateur.")
+
+        user = usercache.get_cached_user(user_id)
+        if user is None or user.token_version != token_version:
+            user = super().get_user(validated_token)
+            usercache.cache_user(user)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("Cet utilisateur est désactivé.", code="user_inactive")
+
+        if user.token_version != token_version:
+            raise AuthenticationFailed(TOKEN_REVOKED, code="token_revoked")
+        return user
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_remove_myuser_rgpd_consent_myuser_can_be_contacted_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='myuser',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Version des jetons'),
+        ),
+    ]
@@ -22,6 +22,7 @@ class MyUser(AbstractUser):
     date_of_birth = models.DateField(verbose_name="Date de naissance")
     can_be_contacted = models.BooleanField(default=False, verbose_name="J'accepte d'être contacté.")
     can_data_be_shared = models.BooleanField(default=False, verbose_name="J'accepte de partager mes données.")
+    token_version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Version des jetons")
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["date_of_birth", "can_be_contacted", "can_data_be_shared"]
 
@@ -35,5 +36,11 @@ class MyUser(AbstractUser):
         )
         return age
 
+    def revoke_tokens(self):
+        """
+        Invalidate every token issued so far, access and refresh, once the user is saved.
+        """
+        self.token_version += 1
+
     def __str__(self):
         return self.username
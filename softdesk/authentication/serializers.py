@@ -2,18 +2,25 @@ from .models import MyUser
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from softdesk.fieldsets import SparseFieldsetSerializerMixin
+from .authentication import TOKEN_REVOKED
+from .tokens import VersionedRefreshToken
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = MyUser
         fields = ("id", "username")
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = MyUser
         fields = ("id", "username", "age", "can_data_be_shared", "can_be_contacted")
+        field_dependencies = {"age": ("date_of_birth",)}
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -53,3 +60,25 @@ class RegisterSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = VersionedRefreshToken
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuse the refresh tokens issued before the user's tokens were revoked.
+    """
+
+    token_class = VersionedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        token_version = refresh.get("token_version")
+        if token_version is not None:
+            user_id = refresh.get(api_settings.USER_ID_CLAIM)
+            current_version = MyUser.objects.filter(pk=user_id).values_list("token_version", flat=True).first()
+            if current_version != token_version:
+                raise AuthenticationFailed(TOKEN_REVOKED, code="token_revoked")
+        return super().validate(attrs)
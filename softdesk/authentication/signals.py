@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from projectsmanagement.models import Project, ProjectContributor
+from projectsmanagement.versioning import touch_projects
+from .models import MyUser
+from .usercache import invalidate
+
+
+@receiver(post_save, sender=MyUser)
+@receiver(post_delete, sender=MyUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate([instance.pk], [instance.username])
+
+
+@receiver(post_init, sender=MyUser)
+def remember_loaded_username(sender, instance, **kwargs):
+    """
+    Keep track of the loaded username so a rename can be detected after saving.
+    """
+    instance._loaded_username = instance.__dict__.get("username")
+
+
+@receiver(post_save, sender=MyUser)
+def touch_renamed_user_projects(sender, instance, created, **kwargs):
+    """
+    The project and issue responses embed the usernames: a rename touches the projects the user
+    authors or contributes to, so their ETags and cached responses change.
+    """
+    if not created and instance._loaded_username != instance.username:
+        owned = Project.objects.filter(author_id=instance.pk).values_list("id", flat=True)
+        contributed = ProjectContributor.objects.filter(user_id=instance.pk).values_list("project_id", flat=True)
+        touch_projects(owned.union(contributed))
+    instance._loaded_username = instance.username
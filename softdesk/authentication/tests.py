@@ -1,3 +1,177 @@
+import datetime
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from projectsmanagement.models import Project, ProjectContributor
+from . import usercache
+from .models import MyUser
+from .tokens import VersionedRefreshToken
 
-# Create your tests here.
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = MyUser.objects.create(username="alice", date_of_birth=datetime.date(1990, 1, 1))
+        self.user.set_password("ancien-mot-de-passe")
+        self.user.save()
+        self.client = APIClient()
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_obtained_tokens_carry_the_user_claims(self):
+        response = self.client.post("/token/", {"username": "alice", "password": "ancien-mot-de-passe"})
+
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data["access"])
+        self.assertEqual(access["user_id"], str(self.user.id))
+        self.assertEqual(access["username"], "alice")
+        self.assertFalse(access["is_staff"])
+        self.assertEqual(access["token_version"], 0)
+
+    def test_cached_user_saves_the_user_query(self):
+        self.authenticate(VersionedRefreshToken.for_user(self.user).access_token)
+        self.count_queries("/api/projects/")
+
+        cached = self.count_queries("/api/projects/")
+        usercache.invalidate([self.user.id])
+        uncached = self.count_queries("/api/projects/")
+
+        self.assertEqual(uncached, cached + 1)
+
+    def test_tokens_without_version_load_the_user(self):
+        self.authenticate(RefreshToken.for_user(self.user).access_token)
+        self.count_queries("/api/projects/")
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/api/projects/")
+
+        self.assertTrue(any('"authentication_myuser"' in query["sql"] for query in context.captured_queries))
+
+    def test_user_changes_invalidate_the_cache(self):
+        self.authenticate(VersionedRefreshToken.for_user(self.user).access_token)
+        self.assertEqual(self.client.get("/api/projects/").status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get("/api/projects/").status_code, 401)
+
+    def test_change_password_revokes_the_tokens(self):
+        refresh = VersionedRefreshToken.for_user(self.user)
+        self.authenticate(refresh.access_token)
+        self.assertEqual(self.client.get("/api/projects/").status_code, 200)
+
+        response = self.client.post(
+            f"/api/users/{self.user.id}/change_password/",
+            {"old_password": "ancien-mot-de-passe", "new_password": "nouveau-mot-de-passe"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        revoked = self.client.get("/api/projects/")
+        self.assertEqual(revoked.status_code, 401)
+        self.assertEqual(revoked.data["detail"].code, "token_revoked")
+        self.assertEqual(self.client.post("/token-refresh/", {"refresh": str(refresh)}).status_code, 401)
+
+        self.authenticate(response.data["access"])
+        self.assertEqual(self.client.get("/api/projects/").status_code, 200)
+        self.assertEqual(self.client.post("/token-refresh/", {"refresh": response.data["refresh"]}).status_code, 200)
+
+
+class UserSparseFieldsetTests(TestCase):
+
+    def setUp(self):
+        self.user = MyUser.objects.create(
+            username="alice", date_of_birth=datetime.date(1990, 1, 1), can_data_be_shared=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_computed_fields_load_their_dependencies(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"/api/users/{self.user.id}/?fields=age")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data), ["age"])
+        sql = context.captured_queries[-1]["sql"]
+        self.assertIn('"date_of_birth"', sql)
+        self.assertNotIn('"password"', sql)
+
+    def test_exclude_on_the_list(self):
+        response = self.client.get("/api/users/?exclude=username")
+
+        self.assertEqual(response.data["results"], [{"id": self.user.id}])
+
+
+class UserCacheTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = MyUser.objects.create(username="alice", date_of_birth=datetime.date(1990, 1, 1))
+
+    def test_lookups_by_username_and_id_share_the_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(usercache.get_user_by_username("alice"), self.user)
+
+        with self.assertNumQueries(0):
+            user = usercache.get_user_by_username("alice")
+            self.assertEqual(usercache.get_users([self.user.id]), {self.user.id: user})
+        self.assertEqual((user.username, user.token_version), ("alice", 0))
+
+    def test_unknown_usernames_are_not_cached(self):
+        with self.assertNumQueries(2):
+            self.assertIsNone(usercache.get_user_by_username("bob"))
+            self.assertIsNone(usercache.get_user_by_username("bob"))
+
+        MyUser.objects.create(username="bob", date_of_birth=datetime.date(1990, 1, 1))
+
+        self.assertIsNotNone(usercache.get_user_by_username("bob"))
+
+    def test_rename_invalidates_both_keys(self):
+        usercache.get_users([self.user.id])
+
+        self.user.username = "alicia"
+        self.user.save()
+
+        self.assertIsNone(usercache.get_user_by_username("alice"))
+        self.assertEqual(usercache.get_user_by_username("alicia").username, "alicia")
+        self.assertEqual(usercache.get_cached_user(self.user.id).username, "alicia")
+
+    def test_rename_touches_the_user_projects(self):
+        other = MyUser.objects.create(username="bob", date_of_birth=datetime.date(1990, 1, 1))
+        owned = Project.objects.create(name="Owned", description="d", type="BACKEND", author=self.user)
+        contributed = Project.objects.create(name="Contributed", description="d", type="BACKEND", author=other)
+        ProjectContributor.objects.create(project=contributed, user=self.user)
+        unrelated = Project.objects.create(name="Unrelated", description="d", type="BACKEND", author=other)
+        versions = dict(Project.objects.values_list("id", "version"))
+
+        self.user.save()
+        self.assertEqual(dict(Project.objects.values_list("id", "version")), versions)
+
+        self.user.username = "alicia"
+        self.user.save()
+
+        changed = {
+            project_id for project_id, version in Project.objects.values_list("id", "version")
+            if version != versions[project_id]
+        }
+        self.assertEqual(changed, {owned.id, contributed.id})
+        self.assertNotIn(unrelated.id, changed)
+
+    def test_deferred_fields_are_loaded_on_access(self):
+        user = usercache.get_users([self.user.id])[self.user.id]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_of_birth, datetime.date(1990, 1, 1))
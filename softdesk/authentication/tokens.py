@@ -0,0 +1,16 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the username, the staff flag and the token version of the user,
+    copied into its access tokens. Incrementing MyUser.token_version revokes both.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["username"] = user.username
+        token["is_staff"] = user.is_staff
+        token["token_version"] = user.token_version
+        return token
@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from softdesk.cachestats import CacheStats, register
+
+
+USER_KEY = "user:{}"
+USERNAME_KEY = "user:username:{}"
+
+# What the permissions, views and serializers read from a user; the other fields are loaded on access.
+CACHED_FIELDS = ("id", "username", "is_staff", "is_superuser", "is_active", "token_version")
+
+
+stats = register("users", CacheStats())
+
+
+def _cache():
+    return caches[getattr(settings, "USER_CACHE_ALIAS", "default")]
+
+
+def _timeout():
+    return getattr(settings, "USER_CACHE_TIMEOUT", 300)
+
+
+def _build_user(values):
+    """
+    A user with the cached fields loaded and the others deferred.
+    """
+    model = get_user_model()
+    # from_db expects the values in the order of the model's concrete fields.
+    cached = dict(zip(CACHED_FIELDS, values))
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in cached]
+    return model.from_db("default", field_names, [cached[name] for name in field_names])
+
+
+def _load_users(**lookup):
+    users = list(get_user_model().objects.filter(**lookup).only(*CACHED_FIELDS))
+    cache_users(users)
+    return users
+
+
+def cache_users(users):
+    entries = {}
+    for user in users:
+        entries[USER_KEY.format(user.pk)] = tuple(getattr(user, name) for name in CACHED_FIELDS)
+        entries[USERNAME_KEY.format(user.username)] = user.pk
+    _cache().set_many(entries, _timeout())
+
+
+def cache_user(user):
+    cache_users([user])
+
+
+def get_cached_user(user_id):
+    """
+    The cached user, None on a cache miss (the database is not read).
+    """
+    values = _cache().get(USER_KEY.format(user_id))
+    if values is None:
+        stats.miss()
+        return None
+    stats.hit()
+    return _build_user(values)
+
+
+def get_users(user_ids):
+    """
+    Return a {user id: user} dict for the existing ids, loading the cache misses with a single query.
+    """
+    user_ids = set(user_ids)
+    keys = {USER_KEY.format(user_id): user_id for user_id in user_ids}
+    users = {keys[key]: _build_user(values) for key, values in _cache().get_many(keys).items()}
+    missing_ids = user_ids - users.keys()
+    for _ in users:
+        stats.hit()
+    for _ in missing_ids:
+        stats.miss()
+    if missing_ids:
+        users.update((user.pk, user) for user in _load_users(pk__in=missing_ids))
+    return users
+
+
+def get_users_by_username(usernames):
+    """
+    Return a {username: user} dict for the existing usernames, loading the cache misses with a single query.
+    """
+    usernames = set(usernames)
+    keys = {USERNAME_KEY.format(username): username for username in usernames}
+    user_ids = {keys[key]: user_id for key, user_id in _cache().get_many(keys).items()}
+    cached = _cache().get_many([USER_KEY.format(user_id) for user_id in user_ids.values()])
+
+    users = {}
+    for username, user_id in user_ids.items():
+        values = cached.get(USER_KEY.format(user_id))
+        # The username entry of a renamed user points to a user with another username.
+        if values is not None and values[CACHED_FIELDS.index("username")] == username:
+            users[username] = _build_user(values)
+            stats.hit()
+    missing = usernames - users.keys()
+    for _ in missing:
+        stats.miss()
+    if missing:
+        users.update((user.username, user) for user in _load_users(username__in=missing))
+    return users
+
+
+def get_user_by_username(username):
+    return get_users_by_username([username]).get(username)
+
+
+def invalidate(user_ids, usernames=()):
+    keys = [USER_KEY.format(user_id) for user_id in user_ids if user_id is not None]
+    keys += [USERNAME_KEY.format(username) for username in usernames]
+    _cache().delete_many(keys)
@@ -9,6 +9,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from .permissions import IsSelfOrReadOnly
 from django.contrib.auth.hashers import check_password
 from rest_framework.decorators import action
+from softdesk.fieldsets import SparseFieldsetMixin
+from .tokens import VersionedRefreshToken
 
 
 class MultipleSerializerMixin:
@@ -38,28 +40,32 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
-class UserViewSet(MultipleSerializerMixin, ModelViewSet):
+class UserViewSet(SparseFieldsetMixin, MultipleSerializerMixin, ModelViewSet):
 
     queryset = MyUser.objects.all()
     serializer_class = UserSerializer
     detail_serializer_class = UserDetailSerializer
     permission_classes = [IsAuthenticated, IsSelfOrReadOnly]
+    # Read by retrieve.
+    always_loaded_fields = ("can_data_be_shared",)
+
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
 
     def retrieve(self, request, *args, **kwargs):
         user = self.get_object()
-        if request.user == user:
-            return super().retrieve(self, request, *args, **kwargs)
-        elif user.can_data_be_shared is not True:
+        if request.user != user and user.can_data_be_shared is not True:
             return Response(
                 {"detail": "Cet utilisateur ne souhaite pas partager ses informations"},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        return super().retrieve(self, request, *args, **kwargs)
+        return Response(self.get_serializer(user).data)
 
     @action(detail=True, methods=["post"], permission_classes=[IsSelfOrReadOnly])
     def change_password(self, request, pk=None):
         """
         Custom action to allow users to change their password.
+        Every token issued before is revoked, the response contains a new refresh and access token.
         Request format:
         {
             "old_password": "currentpassword",
@@ -84,9 +90,16 @@ class UserViewSet(MultipleSerializerMixin, ModelViewSet):
             )
 
         user.set_password(new_password)
+        # The tokens issued with the old password are revoked, the response carries new ones.
+        user.revoke_tokens()
         user.save()
+        refresh = VersionedRefreshToken.for_user(user)
 
         return Response(
-            {"detail": "Mot de passe mis à jour avec succès."},
+            {
+                "detail": "Mot de passe mis à jour avec succès.",
+                "refresh": str(refresh),
+                "access": str(refresh.access_token),
+            },
             status=status.HTTP_200_OK,
         )
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ProjectsManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projectsmanagement'
+
+    def ready(self):
+        from django.core import checks as django_checks
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from . import checks, signals, sqlite
+
+        django_checks.register(checks.check_membership_cache, django_checks.Tags.caches)
+        post_migrate.connect(signals.repair_search_index, sender=self)
+        connection_created.connect(sqlite.configure_connection)
@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    Async versions of the list and retrieve actions of a ConditionalGetMixin viewset, served by
+    ``async_read_view``. The page, the object and the list validators are loaded with the async ORM;
+    authentication, permissions and serializers stay sync (DRF has no async API) and either run in
+    a thread or only read what was already loaded. Cursor pages use the sync list in a thread.
+    """
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, instance)
+        return instance
+
+    async def alist(self, request, *args, **kwargs):
+        paginator = self.paginator
+        if paginator is None or paginator.use_cursor(request):
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = await self.aget_list_validators(queryset)
+        not_modified = self.get_not_modified_response(etag, None)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+
+        # Same page as LimitOffsetPagination.paginate_queryset, with the count of the validators.
+        paginator.request = request
+        paginator.count = self.list_count
+        paginator.limit = paginator.get_limit(request) or paginator.count
+        paginator.offset = paginator.get_offset(request)
+        page = []
+        if paginator.count and paginator.offset <= paginator.count:
+            page = [obj async for obj in queryset[paginator.offset : paginator.offset + paginator.limit]]
+
+        response = paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+        return self.set_validators(response, etag, last_modified)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        etag, last_modified = self.get_object_validators(instance)
+        not_modified = self.get_not_modified_response(etag, last_modified)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+        # Prefetches and response caches are sync.
+        data = await sync_to_async(self.get_retrieve_data)(instance)
+        return self.set_validators(Response(data), etag, last_modified)
+
+
+def async_read_view(sync_view):
+    """
+    Wrap a router view (``ViewSet.as_view(actions)``) of an AsyncReadMixin viewset: GET requests
+    go to the async list/retrieve, the other methods to the sync view, in a thread.
+    """
+    viewset = sync_view.cls
+    actions = sync_view.actions
+    sync_fallback = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await sync_fallback(request, *args, **kwargs)
+
+        action = actions["get"]
+        self = viewset(**sync_view.initkwargs)
+        self.action_map = {"get": action, "head": action}
+        self.args, self.kwargs = args, kwargs
+        self.request = self.initialize_request(request, *args, **kwargs)
+        self.headers = self.default_response_headers
+        try:
+            # Authentication and permissions.
+            await sync_to_async(self.initial)(self.request, *args, **kwargs)
+            response = await getattr(self, f"a{action}")(self.request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        response = self.finalize_response(self.request, response, *args, **kwargs)
+        return response.render() if hasattr(response, "render") else response
+
+    view.cls = viewset
+    view.actions = actions
+    view.initkwargs = sync_view.initkwargs
+    return csrf_exempt(view)
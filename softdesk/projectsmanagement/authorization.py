@@ -0,0 +1,53 @@
+from .membership import get_project_member_ids, get_user_project_ids
+
+
+class AuthorizationContext:
+    """
+    Membership of the request's user, and of the projects the request touches, read once per request
+    from the membership cache and kept as sets of ids, so that the permissions, the serializer validators
+    and the views check access with set lookups. Call ``reset`` after changing a membership in the request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.reset()
+
+    def reset(self):
+        self._project_ids = None
+        self._member_ids = {}
+
+    @property
+    def project_ids(self):
+        """
+        Ids of the projects the user authored or contributes to.
+        """
+        if self._project_ids is None:
+            self._project_ids = get_user_project_ids(self.user.id) if self.user.is_authenticated else frozenset()
+        return self._project_ids
+
+    def member_ids(self, project_id):
+        """
+        Ids of the author and contributors of the project.
+        """
+        if project_id not in self._member_ids:
+            self._member_ids[project_id] = get_project_member_ids(project_id)
+        return self._member_ids[project_id]
+
+    def can_view_project(self, project_id):
+        return project_id in self.project_ids
+
+    def is_member(self, user_id, project_id):
+        if user_id == self.user.id:
+            return self.can_view_project(project_id)
+        return user_id in self.member_ids(project_id)
+
+
+def get_authorization(request):
+    """
+    The AuthorizationContext of the request (a DRF or a Django request), created on first use.
+    """
+    http_request = getattr(request, "_request", request)
+    context = getattr(http_request, "authorization", None)
+    if context is None or context.user.pk != request.user.pk:
+        context = http_request.authorization = AuthorizationContext(request.user)
+    return context
@@ -0,0 +1,447 @@
+import datetime
+import statistics
+import time
+import tracemalloc
+from urllib.parse import urlencode
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from authentication import usercache
+from authentication.tokens import VersionedRefreshToken
+from softdesk import cachestats
+from . import membership
+from .models import Comment, Issue, Project, ProjectContributor
+from .pagination import KeysetPagination
+from .utils import get_viewable_projects
+
+
+class Scenario:
+    """
+    One request to benchmark. "route" is the name of a router url ("<basename>-<action>"),
+    "kwargs" builds its url arguments and "data" its body from the samples of the dataset.
+    Writes run in a transaction that is rolled back, so the dataset is the same for every iteration.
+    """
+
+    def __init__(self, name, method, route, kwargs=None, query="", data=None):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.kwargs = kwargs
+        self.query = query
+        self.data = data
+
+    @property
+    def is_write(self):
+        return self.method != "get"
+
+    def url(self, samples):
+        kwargs = self.kwargs(samples) if self.kwargs else {}
+        query = self.query.format(**samples) if self.query else ""
+        return reverse(self.route, kwargs=kwargs) + (f"?{query}" if query else "")
+
+    def body(self, samples):
+        return self.data(samples) if self.data else None
+
+
+def project_pk(samples):
+    return {"pk": samples["project"]}
+
+
+def issue_pk(samples):
+    return {"pk": samples["issue"]}
+
+
+SCENARIOS = [
+    Scenario("users-list", "get", "users-list"),
+    Scenario("users-detail", "get", "users-detail", kwargs=lambda samples: {"pk": samples["user"]}),
+    Scenario(
+        "users-change-password",
+        "post",
+        "users-change-password",
+        kwargs=lambda samples: {"pk": samples["user"]},
+        data=lambda samples: {"old_password": samples["password"], "new_password": samples["password"]},
+    ),
+    Scenario("projects-list", "get", "projects-list"),
+    Scenario("projects-list-cursor", "get", "projects-list", query="pagination=cursor"),
+    Scenario(
+        "projects-create",
+        "post",
+        "projects-list",
+        data=lambda samples: {"name": "Benchmark", "description": "Benchmark", "type": "BACK_END"},
+    ),
+    Scenario("projects-detail", "get", "projects-detail", kwargs=project_pk),
+    Scenario("projects-detail-sparse", "get", "projects-detail", kwargs=project_pk, query="fields=id,name"),
+    Scenario(
+        "projects-partial-update",
+        "patch",
+        "projects-detail",
+        kwargs=project_pk,
+        data=lambda samples: {"description": "Benchmark"},
+    ),
+    Scenario("projects-destroy", "delete", "projects-detail", kwargs=project_pk),
+    Scenario("projects-export-ndjson", "get", "projects-export", kwargs=project_pk),
+    Scenario("projects-export-csv", "get", "projects-export", kwargs=project_pk, query="output=csv"),
+    Scenario("projects-stats", "get", "projects-stats", kwargs=project_pk),
+    Scenario("projects-overall-stats", "get", "projects-overall-stats"),
+    Scenario(
+        "projects-add-contributors",
+        "post",
+        "projects-add-contributors",
+        kwargs=project_pk,
+        data=lambda samples: {"contributors": samples["usernames"]},
+    ),
+    Scenario(
+        "projects-remove-contributors",
+        "post",
+        "projects-remove-contributors",
+        kwargs=project_pk,
+        data=lambda samples: {"contributors": samples["usernames"]},
+    ),
+    Scenario("issues-list", "get", "issues-list"),
+    Scenario("issues-list-filtered", "get", "issues-list", query="project={project}&status=TODO&priority=HIGH"),
+    Scenario("issues-list-ordered", "get", "issues-list", query="project={project}&ordering=-updated_at"),
+    Scenario("issues-list-sparse", "get", "issues-list", query="project={project}&fields=id,title"),
+    Scenario(
+        "issues-create",
+        "post",
+        "issues-list",
+        data=lambda samples: {
+            "title": "Benchmark",
+            "description": "Benchmark",
+            "project": samples["project"],
+            "tag": "BUG",
+        },
+    ),
+    Scenario("issues-detail", "get", "issues-detail", kwargs=issue_pk),
+    Scenario("issues-detail-sparse", "get", "issues-detail", kwargs=issue_pk, query="exclude=description"),
+    Scenario(
+        "issues-partial-update", "patch", "issues-detail", kwargs=issue_pk, data=lambda samples: {"priority": "LOW"}
+    ),
+    Scenario("issues-destroy", "delete", "issues-detail", kwargs=issue_pk),
+    Scenario(
+        "issues-update-status",
+        "patch",
+        "issues-update-status",
+        kwargs=issue_pk,
+        data=lambda samples: {"status": "IN_PROGRESS"},
+    ),
+    Scenario(
+        "issues-batch",
+        "post",
+        "issues-batch",
+        data=lambda samples: [
+            {"title": f"Benchmark {number}", "description": "Benchmark", "project": samples["project"], "tag": "TASK"}
+            for number in range(10)
+        ]
+        + [{"id": issue_id, "status": "DONE"} for issue_id in samples["issues"]],
+    ),
+    Scenario(
+        "issues-bulk-status",
+        "post",
+        "issues-bulk-status",
+        data=lambda samples: {"ids": samples["issues"], "status": "DONE"},
+    ),
+    Scenario("comments-list", "get", "comments-list"),
+    Scenario("comments-list-filtered", "get", "comments-list", query="issue={issue}"),
+    Scenario(
+        "comments-create",
+        "post",
+        "comments-list",
+        data=lambda samples: {"issue": samples["issue"], "content": "Benchmark"},
+    ),
+    Scenario("comments-detail", "get", "comments-detail", kwargs=lambda samples: {"pk": samples["comment"]}),
+    Scenario(
+        "comments-partial-update",
+        "patch",
+        "comments-detail",
+        kwargs=lambda samples: {"pk": samples["comment"]},
+        data=lambda samples: {"content": "Benchmark"},
+    ),
+    Scenario("comments-destroy", "delete", "comments-detail", kwargs=lambda samples: {"pk": samples["comment"]}),
+    Scenario("search-list", "get", "search-list", query="q=issue"),
+]
+
+
+def router_routes():
+    """
+    Names of the urls registered on the api router.
+    """
+    from softdesk.urls import router
+
+    return sorted({url.name for url in router.urls})
+
+
+def get_samples(user, password):
+    """
+    Pick the objects the scenarios work on: a project of the user (one they author if possible),
+    one of its issues and comments, and a few usernames.
+    """
+    projects = get_viewable_projects(user)
+    project = projects.filter(author=user).order_by("id").first() or projects.order_by("id").first()
+    if project is None:
+        raise ValueError(f"{user.username} ne contribue à aucun projet.")
+
+    issues = Issue.objects.filter(project=project).order_by("id")
+    issue = issues.filter(author=user).first() or issues.first()
+    comments = Comment.objects.filter(issue__project=project).order_by("created_at")
+    comment = comments.filter(author=user).first() or comments.first()
+    if issue is None or comment is None:
+        raise ValueError(f"Le projet {project.id} n'a pas d'issue ou de commentaire.")
+
+    usernames = list(
+        ProjectContributor.objects.filter(project=project)
+        .exclude(user=project.author)
+        .values_list("user__username", flat=True)[:3]
+    )
+    return {
+        "user": user.id,
+        "password": password,
+        "project": project.id,
+        "issue": issue.id,
+        "issues": list(issues.filter(author=user).values_list("id", flat=True)[:20]) or [issue.id],
+        "comment": str(comment.pk),
+        "usernames": usernames,
+    }
+
+
+def client_host():
+    """
+    First host the settings allow, localhost with the DEBUG defaults.
+    """
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def authenticated_client(user):
+    """
+    Test client sending a JWT of the user, like a real client.
+    """
+    token = VersionedRefreshToken.for_user(user).access_token
+    return Client(HTTP_HOST=client_host(), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+def percentile(quantiles, rank):
+    return round(quantiles[rank - 1] * 1000, 3)
+
+
+class Benchmark:
+    """
+    Run the scenarios through the test client, authenticated with a JWT like a real client.
+    Latencies come from "iterations" plain runs, the query count and peak memory from one more
+    instrumented run, so that tracing doesn't inflate the timings.
+    """
+
+    def __init__(self, user, password, iterations=30, warmup=2, scenarios=None):
+        if iterations < 2:
+            raise ValueError("Il faut au moins deux itérations pour calculer des percentiles.")
+        self.user = user
+        self.iterations = iterations
+        self.warmup = warmup
+        self.scenarios = scenarios if scenarios is not None else SCENARIOS
+        self.samples = get_samples(user, password)
+        self.client = authenticated_client(user)
+
+    def request(self, scenario):
+        """
+        Send the request of a scenario and read the whole response, streamed or not.
+        """
+        send = getattr(self.client, scenario.method)
+        body = scenario.body(self.samples)
+        url = scenario.url(self.samples)
+        if body is None:
+            response = send(url)
+        else:
+            response = send(url, data=body, content_type="application/json")
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def run_once(self, scenario):
+        if not scenario.is_write:
+            return self.request(scenario)
+        with transaction.atomic():
+            response = self.request(scenario)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, scenario):
+        for _ in range(self.warmup):
+            self.run_once(scenario)
+
+        timings = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            response = self.run_once(scenario)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            with CaptureQueriesContext(connection) as queries:
+                self.run_once(scenario)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        return {
+            "method": scenario.method.upper(),
+            "route": scenario.route,
+            "status": response.status_code,
+            "p50_ms": percentile(quantiles, 50),
+            "p95_ms": percentile(quantiles, 95),
+            "p99_ms": percentile(quantiles, 99),
+            "queries": len(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def run(self):
+        cachestats.reset_all()
+        endpoints = {scenario.name: self.measure(scenario) for scenario in self.scenarios}
+        covered = {scenario.route for scenario in self.scenarios}
+        return {
+            "dataset": dataset_counts(),
+            "settings": {"iterations": self.iterations, "warmup": self.warmup, "user": self.user.username},
+            "endpoints": endpoints,
+            "uncovered_routes": [route for route in router_routes() if route not in covered],
+            "caches": cachestats.snapshot(),
+        }
+
+
+def read_issue_pages(client, query, keep=None):
+    """
+    Follow the keyset pages of the issue list to the end, like a client reading every result, and count
+    the issues "keep" accepts (all of them by default), the requests, the bytes read and the time taken.
+    """
+    params = {"pagination": "cursor", "limit": KeysetPagination.max_page_size, **query}
+    url = f"{reverse('issues-list')}?{urlencode(params)}"
+    matches = requests = size = 0
+    start = time.perf_counter()
+    while url:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise ValueError(f"{url} a répondu {response.status_code}.")
+        page = response.json()
+        requests += 1
+        size += len(response.content)
+        matches += sum(1 for issue in page["results"] if keep is None or keep(issue))
+        url = page["next"]
+    return {"matches": matches, "requests": requests, "bytes": size, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def measure_filtering(client, filters):
+    """
+    Compare a client that downloads every visible issue and filters them itself with one that sends
+    the filters as query parameters, for filters on fields of the issue list ({"priority": "HIGH"}...).
+    """
+    client_side = read_issue_pages(
+        client, {}, keep=lambda issue: all(str(issue[name]) == value for name, value in filters.items())
+    )
+    server_side = read_issue_pages(client, filters)
+    return {
+        "dataset": dataset_counts(),
+        "filters": filters,
+        "client_side": client_side,
+        "server_side": server_side,
+        "speedup": round(client_side["seconds"] / server_side["seconds"], 1) if server_side["seconds"] else None,
+    }
+
+
+VISIBILITY_ROUTES = ("projects-list", "issues-list", "comments-list")
+
+
+def time_get(client, url, iterations):
+    """
+    p50/p95 latency of a GET over "iterations" runs after one warmup run, and its query count.
+    """
+    client.get(url)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "status": response.status_code,
+        "p50_ms": percentile(quantiles, 50),
+        "p95_ms": percentile(quantiles, 95),
+        "queries": len(queries),
+    }
+
+
+def measure_visibility(sizes, iterations=30, issues_per_project=2):
+    """
+    Latency and query count of the project, issue and comment lists for a user contributing to more and
+    more projects (the "sizes"), each with a few issues and comments. The user and their projects are
+    created in a transaction that is rolled back, and dropped from the caches afterwards.
+    """
+    user_model = get_user_model()
+    report = {}
+    created_projects = []
+    with transaction.atomic():
+        author, user = [
+            user_model.objects.create(username=f"visibility_{role}", date_of_birth=datetime.date(1990, 1, 1))
+            for role in ("author", "user")
+        ]
+        client = authenticated_client(user)
+        for size in sorted(sizes):
+            projects = Project.objects.bulk_create(
+                [
+                    Project(name=f"Visibilité {index}", description="Benchmark", author=author, type="BACK_END")
+                    for index in range(len(created_projects), size)
+                ]
+            )
+            created_projects += projects
+            ProjectContributor.objects.bulk_create([ProjectContributor(project=p, user=user) for p in projects])
+            issues = Issue.objects.bulk_create(
+                [
+                    Issue(title="Issue", description="Benchmark", project=project, author=author, tag="BUG")
+                    for project in projects
+                    for _ in range(issues_per_project)
+                ]
+            )
+            Comment.objects.bulk_create([Comment(issue=issue, author=author, content="Benchmark") for issue in issues])
+            # bulk_create sends no signals, the membership set of the user is dropped by hand.
+            membership.invalidate(user_ids=[user.id])
+            report[size] = {route: time_get(client, reverse(route), iterations) for route in VISIBILITY_ROUTES}
+        transaction.set_rollback(True)
+
+    membership.invalidate(user_ids=[author.id, user.id], project_ids=[project.id for project in created_projects])
+    usercache.invalidate([author.id, user.id], usernames=[author.username, user.username])
+    return report
+
+
+def dataset_counts():
+    return {
+        "users": get_user_model().objects.count(),
+        "projects": Project.objects.count(),
+        "contributors": ProjectContributor.objects.count(),
+        "issues": Issue.objects.count(),
+        "comments": Comment.objects.count(),
+    }
+
+
+def compare(previous, current):
+    """
+    Lines describing the change of latency and query count per endpoint between two reports.
+    """
+    lines = []
+    for name, result in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if before is None:
+            lines.append(f"{name}: nouveau")
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[key]:
+                changes.append(f"{key} {before[key]} -> {result[key]} ({(result[key] / before[key] - 1) * 100:+.0f}%)")
+        changes.append(f"queries {before['queries']} -> {result['queries']}")
+        lines.append(f"{name}: " + ", ".join(changes))
+    return lines
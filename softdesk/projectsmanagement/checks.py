@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error
+from django.core.cache import caches
+from .membership import is_shared_cache
+
+
+def check_membership_cache(app_configs, **kwargs):
+    """
+    The production profile runs several workers: a contributor removed by one of them must lose
+    their access on all of them, so the membership sets need a cache shared by the processes.
+    """
+    if getattr(settings, "DATABASE_PROFILE", "default") != "production":
+        return []
+    alias = getattr(settings, "MEMBERSHIP_CACHE_ALIAS", "default")
+    if is_shared_cache(caches[alias]):
+        return []
+    return [
+        Error(
+            f"Le cache d'appartenance ({alias!r}) est local à chaque processus.",
+            hint="Configurez un cache partagé (Redis, Memcached) pour MEMBERSHIP_CACHE_ALIAS, par exemple avec "
+            "SOFTDESK_CACHE_URL.",
+            id="projectsmanagement.E001",
+        )
+    ]
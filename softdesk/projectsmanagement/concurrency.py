@@ -0,0 +1,278 @@
+import asyncio
+import io
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import OperationalError, connections, transaction
+from django.test import override_settings
+from authentication.tokens import VersionedRefreshToken
+from .benchmark import client_host, get_samples, percentile
+from .models import Issue, Project
+
+# What a client polling its dashboard sends, with the ETag of its last response for each url.
+POLLING_URLS = [
+    "/api/issues/?project={project}",
+    "/api/projects/{project}/",
+    "/api/comments/?issue={issue}",
+    "/api/issues/{issue}/",
+]
+
+# Server setup benchmarked: (handler, url configuration).
+MODES = {
+    "wsgi": ("wsgi", "softdesk.urls"),
+    "asgi-sync": ("asgi", "softdesk.urls"),
+    "asgi-async": ("asgi", "softdesk.asgi_urls"),
+}
+
+
+def split(total, parts):
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+class ConcurrencyBenchmark:
+    """
+    Send the polling workload from "concurrency" clients at once straight to Django's WSGI handler
+    (one thread per client, like a threaded WSGI server) or ASGI application (one task per client,
+    like an ASGI server), without network, and measure throughput and latency.
+    """
+
+    def __init__(self, user, requests=400, concurrency=8):
+        samples = get_samples(user, None)
+        self.urls = [url.format(**samples) for url in POLLING_URLS]
+        self.host = client_host()
+        self.authorization = f"Bearer {VersionedRefreshToken.for_user(user).access_token}"
+        self.requests = requests
+        self.concurrency = concurrency
+
+    def headers(self, etag):
+        headers = {"host": self.host, "authorization": self.authorization}
+        if etag:
+            headers["if-none-match"] = etag
+        return headers
+
+    def wsgi_request(self, handler, url, etag):
+        path, _, query = url.partition("?")
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in self.headers(etag).items():
+            environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status[:3])
+            started["headers"] = dict(headers)
+
+        response = handler(environ, start_response)
+        try:
+            b"".join(response)
+        finally:
+            response.close()
+        return started["status"], started["headers"].get("ETag")
+
+    async def asgi_request(self, application, url, etag):
+        path, _, query = url.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(name.encode(), value.encode()) for name, value in self.headers(etag).items()],
+            "client": ("127.0.0.1", 0),
+            "server": (self.host, 80),
+        }
+        received = []
+        messages = []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client never disconnects, Django cancels this once the response is sent.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            messages.append(message)
+
+        await application(scope, receive, send)
+        headers = dict(messages[0]["headers"])
+        etag = headers.get(b"ETag") or headers.get(b"etag")
+        return messages[0]["status"], etag.decode() if etag else None
+
+    def run_wsgi(self):
+        handler = WSGIHandler()
+
+        def client(count):
+            etags, timings, statuses = {}, [], Counter()
+            try:
+                for index in range(count):
+                    url = self.urls[index % len(self.urls)]
+                    start = time.perf_counter()
+                    status, etags[url] = self.wsgi_request(handler, url, etags.get(url))
+                    timings.append(time.perf_counter() - start)
+                    statuses[status] += 1
+            finally:
+                connections.close_all()
+            return timings, statuses
+
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            return list(pool.map(client, split(self.requests, self.concurrency)))
+
+    def run_asgi(self):
+        application = ASGIHandler()
+
+        async def client(count):
+            etags, timings, statuses = {}, [], Counter()
+            for index in range(count):
+                url = self.urls[index % len(self.urls)]
+                start = time.perf_counter()
+                status, etags[url] = await self.asgi_request(application, url, etags.get(url))
+                timings.append(time.perf_counter() - start)
+                statuses[status] += 1
+            return timings, statuses
+
+        async def clients():
+            return await asyncio.gather(*[client(count) for count in split(self.requests, self.concurrency)])
+
+        return asyncio.run(clients())
+
+    def run(self, mode):
+        handler, urlconf = MODES[mode]
+        with override_settings(ROOT_URLCONF=urlconf):
+            start = time.perf_counter()
+            results = self.run_wsgi() if handler == "wsgi" else self.run_asgi()
+            elapsed = time.perf_counter() - start
+
+        timings = [timing for client_timings, _ in results for timing in client_timings]
+        statuses = sum((client_statuses for _, client_statuses in results), Counter())
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        return {
+            "requests": len(timings),
+            "throughput_rps": round(len(timings) / elapsed, 1),
+            "p50_ms": percentile(quantiles, 50),
+            "p95_ms": percentile(quantiles, 95),
+            "p99_ms": percentile(quantiles, 99),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        }
+
+
+@contextmanager
+def database_profile(name, alias="default"):
+    """
+    Open the next connections of "alias" with the pragmas and options of a SQLITE_PROFILES entry,
+    whatever profile the process was started with.
+    """
+    profile = settings.SQLITE_PROFILES[name]
+    settings_dict = connections.settings[alias]
+    saved_options = settings_dict["OPTIONS"]
+    connections[alias].close()
+    settings_dict["OPTIONS"] = dict(profile["OPTIONS"])
+    try:
+        with override_settings(SQLITE_PRAGMAS=profile["PRAGMAS"]):
+            yield profile
+            connections[alias].close()
+    finally:
+        settings_dict["OPTIONS"] = saved_options
+
+
+class WriterBenchmark:
+    """
+    "writers" threads creating issues in a scratch project, each in its own transaction (the signals bump
+    the project version in it, like POST /api/issues/), while "readers" threads page through its issues.
+    The scratch project and its issues are deleted afterwards.
+    """
+
+    def __init__(self, user, writers=8, writes=400, readers=2):
+        self.user = user
+        self.writers = writers
+        self.writes = writes
+        self.readers = readers
+
+    def write(self, project_id, count):
+        timings, errors = [], Counter()
+        try:
+            for index in range(count):
+                start = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        Issue.objects.create(
+                            title=f"Écriture {index}", description="Benchmark", project_id=project_id, author=self.user
+                        )
+                except OperationalError as error:
+                    errors[str(error)] += 1
+                else:
+                    timings.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+        return timings, errors
+
+    def read(self, project_id, done):
+        reads, errors = 0, Counter()
+        try:
+            while not done.is_set():
+                try:
+                    list(Issue.objects.filter(project_id=project_id).order_by("-id")[:10])
+                    reads += 1
+                except OperationalError as error:
+                    errors[str(error)] += 1
+        finally:
+            connections.close_all()
+        return reads, errors
+
+    def run(self, profile):
+        project = Project.objects.create(
+            name="Benchmark écritures", description="Benchmark", author=self.user, type="BACK_END"
+        )
+        try:
+            with database_profile(profile):
+                done = threading.Event()
+                with ThreadPoolExecutor(self.writers + self.readers) as pool:
+                    readers = [pool.submit(self.read, project.id, done) for _ in range(self.readers)]
+                    start = time.perf_counter()
+                    writers = [pool.submit(self.write, project.id, count) for count in split(self.writes, self.writers)]
+                    results = [writer.result() for writer in writers]
+                    elapsed = time.perf_counter() - start
+                    done.set()
+                    reads = [reader.result() for reader in readers]
+        finally:
+            project.delete()
+
+        timings = [timing for writer_timings, _ in results for timing in writer_timings]
+        errors = sum((writer_errors for _, writer_errors in results), Counter())
+        read_errors = sum((reader_errors for _, reader_errors in reads), Counter())
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive") if len(timings) > 1 else [0] * 99
+        return {
+            "writes": len(timings),
+            "writes_per_second": round(len(timings) / elapsed, 1),
+            "write_p50_ms": percentile(quantiles, 50),
+            "write_p95_ms": percentile(quantiles, 95),
+            "write_p99_ms": percentile(quantiles, 99),
+            "write_errors": dict(errors),
+            "reads_per_second": round(sum(count for count, _ in reads) / elapsed, 1),
+            "read_errors": dict(read_errors),
+        }
@@ -0,0 +1,99 @@
+import hashlib
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+from .authorization import get_authorization
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag and Last-Modified headers to list and retrieve responses, and answer 304 Not Modified
+    when the client's copy is still current, before anything is serialized.
+
+    Validators are derived from ``updated_at`` columns: one aggregate query for a list, the already
+    loaded object for a retrieve. Views can override ``get_object_version`` (e.g. with a version counter)
+    and ``prefetch_instance`` / ``get_retrieve_data`` (to load relations or cached data only when the
+    body is actually sent).
+    """
+
+    last_modified_field = "updated_at"
+
+    def make_etag(self, *parts):
+        parts = (self.request.get_full_path(), *parts)
+        return quote_etag(hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest())
+
+    def get_object_version(self, instance):
+        return getattr(instance, self.last_modified_field)
+
+    def get_list_validators(self, queryset):
+        """
+        Return the (etag, last modified datetime) pair of a list. The ETag covers deletions (count)
+        and membership changes (viewable projects); the Last-Modified alone does not.
+        """
+        aggregates = queryset.order_by().aggregate(**self.get_list_aggregates())
+        return self.make_list_validators(aggregates, get_authorization(self.request).project_ids)
+
+    async def aget_list_validators(self, queryset):
+        """
+        Same as ``get_list_validators``, with the async ORM.
+        """
+        aggregates = await queryset.order_by().aaggregate(**self.get_list_aggregates())
+        visible_projects = await sync_to_async(lambda: get_authorization(self.request).project_ids)()
+        return self.make_list_validators(aggregates, visible_projects)
+
+    def get_list_aggregates(self):
+        return {"count": Count("pk"), "last_modified": Max(self.last_modified_field)}
+
+    def make_list_validators(self, aggregates, visible_projects):
+        # Reused by the paginator instead of a second COUNT(*).
+        self.list_count = aggregates["count"]
+        etag = self.make_etag(aggregates["count"], aggregates["last_modified"], sorted(visible_projects))
+        return etag, aggregates["last_modified"]
+
+    def get_object_validators(self, instance):
+        last_modified = getattr(instance, self.last_modified_field)
+        return self.make_etag(instance.pk, self.get_object_version(instance)), last_modified
+
+    def get_not_modified_response(self, etag, last_modified):
+        return get_conditional_response(
+            self.request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def set_validators(self, response, etag, last_modified):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def prefetch_instance(self, instance):
+        pass
+
+    def get_retrieve_data(self, instance):
+        self.prefetch_instance(instance)
+        return self.get_serializer(instance).data
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        if paginator is not None and getattr(paginator, "use_cursor", lambda request: False)(request):
+            # Keyset pages must stay constant-cost, a full-list aggregate would defeat them.
+            return super().list(request, *args, **kwargs)
+
+        etag, last_modified = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        # Deleting an issue does not move the latest updated_at, so lists are only validated on their ETag.
+        not_modified = self.get_not_modified_response(etag, None)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+        return self.set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        not_modified = self.get_not_modified_response(etag, last_modified)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+        return self.set_validators(Response(self.get_retrieve_data(instance)), etag, last_modified)
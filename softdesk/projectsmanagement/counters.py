@@ -0,0 +1,162 @@
+from collections import Counter, defaultdict
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .models import Comment, Issue, Project
+from .versioning import touch_projects
+
+# Counter of the issues of a project, per status.
+STATUS_COUNT_FIELDS = {
+    "TODO": "todo_issue_count",
+    "IN_PROGRESS": "in_progress_issue_count",
+    "DONE": "done_issue_count",
+}
+
+
+def _add(field, delta):
+    """
+    F() expression adding delta to a counter, floored at 0 so that a drifted counter doesn't fail the write.
+    """
+    if delta < 0:
+        return Greatest(F(field) + delta, Value(0))
+    return F(field) + delta
+
+
+def update_issue_counts(deltas):
+    """
+    Apply a Counter of {(project id, status): number of issues added (or removed if negative)}
+    to the project counters, with one UPDATE per project.
+    """
+    updates = defaultdict(dict)
+    for (project_id, status), delta in deltas.items():
+        if delta and project_id is not None and status in STATUS_COUNT_FIELDS:
+            updates[project_id][STATUS_COUNT_FIELDS[status]] = _add(STATUS_COUNT_FIELDS[status], delta)
+    for project_id, fields in updates.items():
+        Project.objects.filter(id=project_id).update(**fields)
+
+
+def issue_moves(issues):
+    """
+    The issue count deltas of issues whose project or status changed since they were loaded.
+    """
+    deltas = Counter()
+    for issue in issues:
+        loaded = (issue._loaded_project_id, issue._loaded_status)
+        current = (issue.project_id, issue.status)
+        if loaded != current and None not in loaded:
+            deltas[loaded] -= 1
+            deltas[current] += 1
+    return deltas
+
+
+def add_comment(issue_id, created_at):
+    """
+    Count a new comment on the issue. updated_at is bumped too, for the ETags of the issue lists.
+    """
+    Issue.objects.filter(id=issue_id).update(
+        comment_count=F("comment_count") + 1, last_activity_at=created_at, updated_at=timezone.now()
+    )
+
+
+def add_comments(comments):
+    """
+    Count comments created in bulk, with one UPDATE per issue: the comment count grows by the number
+    of new comments and the last activity moves to the latest of them if it is more recent.
+    The statements are sent with executemany, building them with the ORM costs more than running them.
+    """
+    dates = defaultdict(list)
+    for comment in comments:
+        dates[comment.issue_id].append(comment.created_at)
+    if not dates:
+        return
+    quote = connection.ops.quote_name
+    adapt = connection.ops.adapt_datetimefield_value
+    last_activity = quote("last_activity_at")
+    sql = (
+        f"UPDATE {quote(Issue._meta.db_table)} SET {quote('comment_count')} = {quote('comment_count')} + %s, "
+        f"{last_activity} = CASE WHEN {last_activity} IS NULL OR {last_activity} < %s THEN %s "
+        f"ELSE {last_activity} END, {quote('updated_at')} = %s WHERE {quote('id')} = %s"
+    )
+    now = adapt(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            sql,
+            [
+                (len(created_at), adapt(max(created_at)), adapt(max(created_at)), now, issue_id)
+                for issue_id, created_at in dates.items()
+            ],
+        )
+
+
+def remove_comment(issue_id):
+    """
+    Uncount a deleted comment; the last activity goes back to the latest remaining comment.
+    """
+    latest = Comment.objects.filter(issue=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+    Issue.objects.filter(id=issue_id).update(
+        comment_count=_add("comment_count", -1), last_activity_at=Subquery(latest), updated_at=timezone.now()
+    )
+
+
+def reconcile(project_ids=None, issue_ids=None, fix=True):
+    """
+    Recompute the counters of the given projects and issues (all of them by default) with GROUP BY
+    queries, and write the drifted ones back when "fix" is set, touching their projects.
+    Return the drift as {"projects": {id: {field: [stored, actual]}}, "issues": {...}}.
+    """
+    projects = Project.objects.all()
+    issues = Issue.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(id__in=project_ids)
+    if issue_ids is not None:
+        issues = issues.filter(id__in=issue_ids)
+
+    issue_counts = Counter()
+    grouped = Issue.objects.filter(project__in=projects).values("project_id", "status").annotate(count=Count("id"))
+    for row in grouped.order_by():
+        issue_counts[(row["project_id"], row["status"])] = row["count"]
+    drift = {"projects": {}, "issues": {}}
+    drifted_projects = []
+    for project in projects.only("id", *STATUS_COUNT_FIELDS.values()).iterator():
+        for status, field in STATUS_COUNT_FIELDS.items():
+            actual = issue_counts[(project.id, status)]
+            if getattr(project, field) != actual:
+                drift["projects"].setdefault(project.id, {})[field] = [getattr(project, field), actual]
+                setattr(project, field, actual)
+        if project.id in drift["projects"]:
+            drifted_projects.append(project)
+
+    comments = {
+        row["issue_id"]: (row["count"], row["latest"])
+        for row in Comment.objects.filter(issue__in=issues)
+        .values("issue_id")
+        .annotate(count=Count("pk"), latest=Max("created_at"))
+        .order_by()
+    }
+    drifted_issues = []
+    for issue in issues.only("id", "project_id", "comment_count", "last_activity_at").iterator():
+        count, latest = comments.get(issue.id, (0, None))
+        for field, actual in (("comment_count", count), ("last_activity_at", latest)):
+            if getattr(issue, field) != actual:
+                stored = getattr(issue, field)
+                drift["issues"].setdefault(issue.id, {})[field] = [
+                    value.isoformat() if hasattr(value, "isoformat") else value for value in (stored, actual)
+                ]
+                setattr(issue, field, actual)
+        if issue.id in drift["issues"]:
+            drifted_issues.append(issue)
+
+    if fix:
+        now = timezone.now()
+        for issue in drifted_issues:
+            issue.updated_at = now
+        with transaction.atomic():
+            Project.objects.bulk_update(drifted_projects, fields=list(STATUS_COUNT_FIELDS.values()), batch_size=500)
+            Issue.objects.bulk_update(
+                drifted_issues, fields=["comment_count", "last_activity_at", "updated_at"], batch_size=500
+            )
+            touch_projects(
+                {project.id for project in drifted_projects} | {issue.project_id for issue in drifted_issues}
+            )
+    return drift
@@ -0,0 +1,75 @@
+import csv
+import json
+from .models import Comment, Issue
+
+
+ISSUE_COLUMNS = {
+    "id": "id",
+    "project": "project_id",
+    "title": "title",
+    "description": "description",
+    "status": "status",
+    "priority": "priority",
+    "tag": "tag",
+    "author": "author__username",
+    "assignee": "assignee__username",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+COMMENT_COLUMNS = {
+    "id": "id",
+    "issue": "issue_id",
+    "author": "author__username",
+    "content": "content",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+CSV_COLUMNS = ["type", *dict.fromkeys([*ISSUE_COLUMNS, *COMMENT_COLUMNS])]
+FORMATS = ("ndjson", "csv")
+
+
+def _rows(queryset, row_type, columns, chunk_size):
+    lookups = list(columns.values())
+    for values in queryset.order_by("pk").values_list(*lookups).iterator(chunk_size=chunk_size):
+        row = {"type": row_type}
+        for column, value in zip(columns, values):
+            row[column] = value.isoformat() if hasattr(value, "isoformat") else value
+        yield row
+
+
+def export_rows(project, chunk_size=2000):
+    """
+    Yield the issues then the comments of the project as flat dicts, reading the database
+    chunk by chunk so memory usage does not depend on the project size.
+    """
+    yield from _rows(Issue.objects.filter(project=project), "issue", ISSUE_COLUMNS, chunk_size)
+    yield from _rows(Comment.objects.filter(issue__project=project), "comment", COMMENT_COLUMNS, chunk_size)
+
+
+def to_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, default=str, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """
+    File-like object handing back what csv.writer writes, so each row can be streamed.
+    """
+
+    def write(self, value):
+        return value
+
+
+def to_csv(rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS)
+    yield writer.writerow(dict(zip(CSV_COLUMNS, CSV_COLUMNS)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def render(project, output_format, chunk_size=2000):
+    """
+    Return an iterator of text lines exporting the project in the given format ("ndjson" or "csv").
+    """
+    rows = export_rows(project, chunk_size)
+    return to_csv(rows) if output_format == "csv" else to_ndjson(rows)
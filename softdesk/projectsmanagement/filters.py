@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class QueryParameterFilter(BaseFilterBackend):
+    """
+    Filter the queryset on the query parameters declared in the view's ``filter_fields``,
+    a {query parameter: ORM lookup} dict. Several values can be given separated by commas.
+    Values are validated against the model field (choices, integer ids...) so invalid values
+    return a 400 instead of an empty list, and each parameter compiles to a plain indexed
+    ``=``/``IN`` condition.
+    """
+
+    separator = ","
+
+    def get_model_field(self, model, lookup):
+        field = None
+        for name in lookup.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model
+        return field
+
+    def clean_value(self, field, value):
+        if field.choices and value not in dict(field.choices):
+            raise DjangoValidationError(f"'{value}' n'est pas un choix valide ({', '.join(dict(field.choices))}).")
+        return field.to_python(value)
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        errors = {}
+        for param, lookup in getattr(view, "filter_fields", {}).items():
+            raw_value = request.query_params.get(param)
+            if not raw_value:
+                continue
+            field = self.get_model_field(queryset.model, lookup)
+            try:
+                values = [self.clean_value(field, value) for value in raw_value.split(self.separator) if value]
+            except DjangoValidationError as error:
+                errors[param] = error.messages
+                continue
+            if len(values) == 1:
+                filters[lookup] = values[0]
+            else:
+                filters[f"{lookup}__in"] = values
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**filters)
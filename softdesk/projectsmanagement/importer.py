@@ -0,0 +1,218 @@
+import csv
+import json
+import uuid
+from collections import Counter
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from . import counters
+from .models import Comment, Issue, Project
+from .utils import resolve_usernames
+from .versioning import touch_projects
+
+
+class RowError(Exception):
+    pass
+
+
+TIMESTAMP_FIELDS = ["created_at", "updated_at"]
+
+
+def bulk_create_with_timestamps(model, objects):
+    """
+    bulk_create the objects, then write back the created_at/updated_at values set on them, which
+    auto_now(_add) replaced with the current time, with one bulk_update.
+    """
+    timestamps = [(obj.created_at, obj.updated_at) for obj in objects]
+    model.objects.bulk_create(objects)
+    for obj, (created_at, updated_at) in zip(objects, timestamps):
+        obj.created_at, obj.updated_at = created_at, updated_at
+    model.objects.bulk_update(objects, TIMESTAMP_FIELDS)
+
+
+def read_records(file, input_format):
+    """
+    Yield the records of an NDJSON or CSV file (in the export_project format) as dicts.
+    Empty CSV cells are read as missing values. NDJSON lines that are not a JSON object are
+    yielded as a RowError, so the importer rejects them without shifting the record numbers.
+    """
+    if input_format == "csv":
+        for row in csv.DictReader(file):
+            yield {key: value for key, value in row.items() if value != ""}
+        return
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield RowError(f"JSON invalide : {error}.")
+            continue
+        yield record if isinstance(record, dict) else RowError(f"objet JSON attendu : {line.strip()[:50]!r}.")
+
+
+def _choice(record, name, choices, default=None):
+    value = record.get(name, default)
+    if value not in dict(choices):
+        raise RowError(f"{name} invalide : {value!r} (choix : {', '.join(dict(choices))}).")
+    return value
+
+
+def _datetime(record, name):
+    value = record.get(name)
+    if value is None:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise RowError(f"{name} invalide : {value!r}.")
+    return parsed
+
+
+class Importer:
+    """
+    Bulk import of issues and comments, one batch per transaction.
+
+    Usernames, projects and referenced issues are resolved with one query per batch, issues and
+    comments are written with bulk_create. Source ids and created_at/updated_at values are kept,
+    so comments can reference the issues of the same file.
+    """
+
+    def __init__(self, project=None):
+        self.project = project
+        self.errors = []
+
+    def import_batch(self, batch):
+        """
+        Validate and write a batch of (record number, record) pairs. Invalid records, and the ones
+        whose id is already taken, are skipped and kept in self.errors. Return the number of imported records.
+        """
+        for number, record in batch:
+            if isinstance(record, RowError):
+                self.errors.append((number, str(record)))
+        batch = [(number, record) for number, record in batch if not isinstance(record, RowError)]
+
+        usernames = set()
+        for _, record in batch:
+            usernames.update(record[name] for name in ("author", "assignee") if record.get(name))
+        users = resolve_usernames(usernames)
+
+        issue_records = [(number, record) for number, record in batch if record.get("type") == "issue"]
+        comment_records = [(number, record) for number, record in batch if record.get("type") == "comment"]
+        for number, record in batch:
+            if record.get("type") not in ("issue", "comment"):
+                self.errors.append((number, f"type invalide : {record.get('type')!r}."))
+
+        project_ids = {self._project_id(record) for _, record in issue_records}
+        projects = Project.objects.in_bulk([project_id for project_id in project_ids if project_id is not None])
+
+        issues = []
+        for number, record in issue_records:
+            try:
+                issues.append((number, self._build_issue(record, users, projects)))
+            except (RowError, KeyError, TypeError, ValueError) as error:
+                self.errors.append((number, str(error)))
+        issues = self._new_ids(Issue, issues)
+
+        batch_issue_ids = {issue.id for issue in issues if issue.id is not None}
+        referenced_ids = set()
+        for _, record in comment_records:
+            try:
+                referenced_ids.add(int(record["issue"]))
+            except (KeyError, TypeError, ValueError):
+                pass
+        existing_issues = dict(
+            Issue.objects.filter(id__in=referenced_ids - batch_issue_ids).values_list("id", "project_id")
+        )
+
+        comments = []
+        for number, record in comment_records:
+            try:
+                comments.append((number, self._build_comment(record, users, existing_issues.keys() | batch_issue_ids)))
+            except (RowError, KeyError, TypeError, ValueError) as error:
+                self.errors.append((number, str(error)))
+        comments = self._new_ids(Comment, comments)
+
+        with transaction.atomic():
+            bulk_create_with_timestamps(Issue, issues)
+            bulk_create_with_timestamps(Comment, comments)
+            # bulk_create does not send signals, the counters are updated and the projects touched here.
+            counters.update_issue_counts(Counter((issue.project_id, issue.status) for issue in issues))
+            counters.add_comments(comments)
+            touch_projects(
+                {issue.project_id for issue in issues}
+                | {existing_issues[comment.issue_id] for comment in comments if comment.issue_id in existing_issues}
+            )
+
+        return len(issues) + len(comments)
+
+    def _new_ids(self, model, numbered_objects):
+        """
+        Drop the objects whose source id is already used, in the database or earlier in the batch,
+        with one query. Return the remaining objects.
+        """
+        ids = {obj.id for _, obj in numbered_objects if obj.id is not None}
+        taken = set(model.objects.filter(id__in=ids).values_list("id", flat=True))
+        objects = []
+        for number, obj in numbered_objects:
+            if obj.id in taken:
+                self.errors.append((number, f"id déjà utilisé : {obj.id}."))
+                continue
+            if obj.id is not None:
+                taken.add(obj.id)
+            objects.append(obj)
+        return objects
+
+    def _project_id(self, record):
+        if self.project is not None:
+            return self.project.id
+        try:
+            return int(record["project"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _user(self, record, name, users, required=True):
+        username = record.get(name)
+        if username is None and not required:
+            return None
+        if username not in users:
+            raise RowError(f"{name} inconnu : {username!r}.")
+        return users[username]
+
+    def _build_issue(self, record, users, projects):
+        project = projects.get(self._project_id(record))
+        if project is None:
+            raise RowError(f"projet inconnu : {record.get('project')!r}.")
+        if not record.get("title"):
+            raise RowError("title manquant.")
+        issue = Issue(
+            id=int(record["id"]) if record.get("id") is not None else None,
+            title=record["title"],
+            description=record.get("description", ""),
+            project=project,
+            author_id=self._user(record, "author", users),
+            assignee_id=self._user(record, "assignee", users, required=False),
+            status=_choice(record, "status", Issue.STATUS_CHOICES, "TODO"),
+            priority=_choice(record, "priority", Issue.PRIORITY_CHOICES, "MEDIUM"),
+            tag=_choice(record, "tag", Issue.TAG_CHOICES),
+        )
+        self._set_timestamps(issue, record)
+        return issue
+
+    def _build_comment(self, record, users, issue_ids):
+        issue_id = int(record["issue"])
+        if issue_id not in issue_ids:
+            raise RowError(f"issue inconnue : {issue_id}.")
+        comment = Comment(
+            issue_id=issue_id,
+            author_id=self._user(record, "author", users),
+            content=record.get("content", ""),
+        )
+        if record.get("id") is not None:
+            comment.id = uuid.UUID(str(record["id"]))
+        self._set_timestamps(comment, record)
+        return comment
+
+    def _set_timestamps(self, obj, record):
+        now = timezone.now()
+        obj.created_at = _datetime(record, "created_at") or now
+        obj.updated_at = _datetime(record, "updated_at") or obj.created_at
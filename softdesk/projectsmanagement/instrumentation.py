@@ -0,0 +1,219 @@
+import itertools
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from softdesk import cachestats
+
+logger = logging.getLogger("softdesk.sql")
+cache_logger = logging.getLogger("softdesk.cache")
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SERVER_TIMING": False,
+    "DEFAULT_BUDGET": {},
+    "BUDGETS": {},
+    "CACHE_STATS_EVERY": 0,
+}
+
+# Requests seen by the middleware, for the periodic cache counters log line.
+request_counter = itertools.count(1)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SQL_INSTRUMENTATION", {})}
+
+
+class QueryMetrics:
+    """
+    Execute wrapper (see ``connection.execute_wrapper``) counting the queries of a request,
+    their total duration and the duplicates (same SQL and same parameters run more than once).
+    """
+
+    def __init__(self):
+        self.statements = Counter()
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def queries(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self):
+        return self.queries - len(self.statements)
+
+    @property
+    def db_time_ms(self):
+        return round(self.db_time * 1000, 3)
+
+    def duplicated_statements(self):
+        return [sql for (sql, _), count in self.statements.items() if count > 1]
+
+    def as_dict(self):
+        return {"queries": self.queries, "db_time_ms": self.db_time_ms, "duplicates": self.duplicates}
+
+
+def get_view_name(request):
+    """
+    "<ViewSet>.<action>" for the router views (e.g. "ProjectViewSet.list"), the url name otherwise.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    view_class = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", None)
+    if view_class is not None and actions:
+        return f"{view_class.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+    if view_class is not None:
+        return view_class.__name__
+    return match.view_name
+
+
+def get_budget(view_name, config=None):
+    """
+    Budget of a view: its entry in BUDGETS on top of DEFAULT_BUDGET.
+    """
+    config = config or get_config()
+    return {**config["DEFAULT_BUDGET"], **config["BUDGETS"].get(view_name, {})}
+
+
+def exceeded_budget(metrics, budget):
+    """
+    Return the {metric: (value, limit)} of the budget that the metrics go over.
+    """
+    values = metrics.as_dict()
+    return {name: (values[name], limit) for name, limit in budget.items() if values[name] > limit}
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the queries of each request on ``response.query_metrics``, add a Server-Timing header
+    when SQL_INSTRUMENTATION["SERVER_TIMING"] is set, and log the requests over their view budget.
+    Every SQL_INSTRUMENTATION["CACHE_STATS_EVERY"] requests, the cache counters are logged too.
+    Queries run while a streaming response is consumed are not counted.
+
+    Under ASGI the queries run in the request's sync thread, where the wrapper is installed; concurrent
+    requests sharing that thread (outside of ASGIHandler's per-request threads) share their metrics.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = get_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        metrics = QueryMetrics()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        return self.process_metrics(request, response, metrics, start, config)
+
+    async def __acall__(self, request):
+        config = get_config()
+        if not config["ENABLED"]:
+            return await self.get_response(request)
+
+        metrics = QueryMetrics()
+        start = time.perf_counter()
+        await sync_to_async(install_wrapper)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(uninstall_wrapper)(metrics)
+        return self.process_metrics(request, response, metrics, start, config)
+
+    def process_metrics(self, request, response, metrics, start, config):
+        total_ms = (time.perf_counter() - start) * 1000
+        view_name = get_view_name(request)
+        response.query_metrics = metrics
+        response.view_name = view_name
+
+        if config["SERVER_TIMING"]:
+            response["Server-Timing"] = (
+                f'db;dur={metrics.db_time_ms};desc="{metrics.queries} queries, {metrics.duplicates} duplicates", '
+                f"total;dur={total_ms:.3f}"
+            )
+
+        exceeded = exceeded_budget(metrics, get_budget(view_name, config))
+        if exceeded:
+            logger.warning(
+                "%s %s (%s) dépasse son budget SQL: %s. Requêtes dupliquées: %s",
+                request.method,
+                request.path,
+                view_name,
+                ", ".join(f"{name} {value} > {limit}" for name, (value, limit) in exceeded.items()),
+                metrics.duplicated_statements(),
+            )
+
+        every = config["CACHE_STATS_EVERY"]
+        if every and next(request_counter) % every == 0:
+            log_cache_stats()
+        return response
+
+
+def log_cache_stats():
+    """
+    Log the counters of every cache layer since the process started, on the "softdesk.cache" logger.
+    """
+    cache_logger.info(
+        "Caches: %s",
+        "; ".join(format_cache_stats(name, counters) for name, counters in cachestats.snapshot().items()),
+    )
+
+
+def format_cache_stats(name, counters):
+    line = f"{name} {counters['hits']} hits / {counters['misses']} misses ({counters['hit_rate']:.0%})"
+    if "bytes_saved" in counters:
+        line += f", {counters['bytes_saved']} bytes saved"
+    return line
+
+
+def install_wrapper(metrics):
+    for connection in connections.all():
+        connection.execute_wrappers.append(metrics)
+
+
+def uninstall_wrapper(metrics):
+    for connection in connections.all():
+        connection.execute_wrappers.remove(metrics)
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin checking the responses of the test client against the SQL budgets of their view.
+    """
+
+    def assertWithinBudget(self, response, budget=None):
+        metrics = getattr(response, "query_metrics", None)
+        if metrics is None:
+            self.fail("La réponse n'a pas de métriques SQL, QueryInstrumentationMiddleware est-il activé ?")
+        budget = budget if budget is not None else get_budget(response.view_name)
+        exceeded = exceeded_budget(metrics, budget)
+        if exceeded:
+            self.fail(
+                f"{response.view_name} dépasse son budget SQL: "
+                + ", ".join(f"{name} {value} > {limit}" for name, (value, limit) in exceeded.items())
+                + f". Requêtes dupliquées: {metrics.duplicated_statements()}"
+            )
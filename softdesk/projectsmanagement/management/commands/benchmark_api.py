@@ -0,0 +1,61 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement.benchmark import SCENARIOS, Benchmark, compare
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every endpoint of the api router through the test client and report "
+        "p50/p95/p99 latency, SQL query count and peak memory per endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default="bench_user_0", help="Username the requests are sent as.")
+        parser.add_argument("--password", default="benchmark-password", help="Password of that user.")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="+", help="Names of the scenarios to run (all by default).")
+        parser.add_argument("--output", help="File to write the JSON report to (standard output by default).")
+        parser.add_argument("--compare", help="Previous JSON report to compare the results with.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"L'utilisateur {options['user']} n'existe pas, lancez d'abord seed_data.")
+
+        scenarios = SCENARIOS
+        if options["only"]:
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in options["only"]]
+            unknown = set(options["only"]) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Scénarios inconnus: {', '.join(sorted(unknown))}.")
+
+        try:
+            benchmark = Benchmark(
+                user,
+                options["password"],
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                scenarios=scenarios,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+        report = benchmark.run()
+
+        content = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as previous:
+                for line in compare(json.load(previous), report):
+                    self.stdout.write(line)
+
+        if report["uncovered_routes"]:
+            self.stderr.write(f"Routes non couvertes: {', '.join(report['uncovered_routes'])}.")
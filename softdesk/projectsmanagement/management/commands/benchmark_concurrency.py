@@ -0,0 +1,48 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement.benchmark import dataset_counts
+from projectsmanagement.concurrency import MODES, ConcurrencyBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the WSGI handler, the ASGI handler with sync views and the ASGI handler "
+        "with async views on a polling workload (conditional GETs of lists and details), at several concurrencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default="bench_user_0", help="Username the requests are sent as.")
+        parser.add_argument("--requests", type=int, default=400, help="Requests per mode and concurrency.")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+        parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+        parser.add_argument("--output", help="File to write the JSON report to (standard output by default).")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"L'utilisateur {options['user']} n'existe pas, lancez d'abord seed_data.")
+
+        results = {}
+        for mode in options["modes"]:
+            results[mode] = {}
+            for concurrency in options["concurrency"]:
+                try:
+                    benchmark = ConcurrencyBenchmark(user, options["requests"], concurrency)
+                except ValueError as error:
+                    raise CommandError(str(error))
+                result = benchmark.run(mode)
+                results[mode][str(concurrency)] = result
+                self.stderr.write(
+                    f"{mode} x{concurrency}: {result['throughput_rps']} req/s, p95 {result['p95_ms']} ms"
+                )
+
+        report = {"dataset": dataset_counts(), "settings": {"requests": options["requests"]}, "modes": results}
+        content = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
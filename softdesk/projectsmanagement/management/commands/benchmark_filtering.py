@@ -0,0 +1,43 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement.benchmark import authenticated_client, measure_filtering
+from projectsmanagement.models import Issue
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare filtering the issue list client-side (reading every page of the visible issues) with "
+        "server-side query parameters, and report the requests, bytes and time of each as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default="bench_user_0", help="Username the requests are sent as.")
+        parser.add_argument("--assignee", help="Assignee to filter on (the user by default).")
+        parser.add_argument("--priority", default="HIGH", choices=dict(Issue.PRIORITY_CHOICES))
+        parser.add_argument("--output", help="File to write the JSON report to (standard output by default).")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"L'utilisateur {options['user']} n'existe pas, lancez d'abord seed_data.")
+
+        filters = {"assignee": options["assignee"] or user.username, "priority": options["priority"]}
+        try:
+            report = measure_filtering(authenticated_client(user), filters)
+        except ValueError as error:
+            raise CommandError(str(error))
+        if report["client_side"]["matches"] != report["server_side"]["matches"]:
+            raise CommandError(
+                f"Résultats différents : {report['client_side']['matches']} issues filtrées côté client, "
+                f"{report['server_side']['matches']} côté serveur."
+            )
+
+        content = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
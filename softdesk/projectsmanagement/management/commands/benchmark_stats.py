@@ -0,0 +1,66 @@
+import json
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from projectsmanagement import projectstats
+from projectsmanagement.benchmark import percentile
+from projectsmanagement.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the statistics of a project, computed (cold cache) and read from the cache (warm), "
+        "and fail when the cold p95 goes over --max-ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, help="Id of the project (the one with the most issues by default).")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--max-ms", type=float, default=100, help="Latency budget of the cold p95, in ms.")
+        parser.add_argument("--output", help="File to write the JSON report to (standard output by default).")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("Il faut au moins deux itérations pour calculer des percentiles.")
+        projects = Project.objects.only("id", "version")
+        if options["project"] is not None:
+            project = projects.filter(id=options["project"]).first()
+        else:
+            project = projects.annotate(issue_count=Count("issues")).order_by("-issue_count").first()
+        if project is None:
+            raise CommandError("Aucun projet à mesurer, lancez d'abord seed_data.")
+
+        def measure(cold):
+            timings = []
+            for _ in range(options["iterations"]):
+                if cold:
+                    projectstats._cache().delete(projectstats.STATS_KEY.format(project.id, project.version))
+                start = time.perf_counter()
+                histogram = projectstats.get_histograms([project])[project.id]
+                projectstats.render(histogram)
+                timings.append(time.perf_counter() - start)
+            quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+            return {"p50_ms": percentile(quantiles, 50), "p95_ms": percentile(quantiles, 95)}, histogram
+
+        cold, histogram = measure(cold=True)
+        warm, _ = measure(cold=False)
+        report = {
+            "project": project.id,
+            "issues": sum(histogram["status"].values()),
+            "iterations": options["iterations"],
+            "max_ms": options["max_ms"],
+            "cold": cold,
+            "warm": warm,
+        }
+
+        content = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
+
+        if cold["p95_ms"] > options["max_ms"]:
+            raise CommandError(f"p95 à froid de {cold['p95_ms']} ms, au-delà de {options['max_ms']} ms.")
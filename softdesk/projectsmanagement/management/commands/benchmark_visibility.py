@@ -0,0 +1,36 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement.benchmark import dataset_counts, measure_visibility
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the latency and query count of the project, issue and comment lists for a user who "
+        "contributes to more and more projects, and report them per membership size as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000], help="Membership sizes.")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--issues", type=int, default=2, help="Issues (and comments) per project.")
+        parser.add_argument("--output", help="File to write the JSON report to (standard output by default).")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("Il faut au moins deux itérations pour calculer des percentiles.")
+        if min(options["sizes"]) < 1:
+            raise CommandError("Les tailles doivent être positives.")
+
+        report = {
+            "dataset": dataset_counts(),
+            "iterations": options["iterations"],
+            "sizes": measure_visibility(options["sizes"], options["iterations"], options["issues"]),
+        }
+
+        content = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
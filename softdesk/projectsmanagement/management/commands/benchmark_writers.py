@@ -0,0 +1,57 @@
+import json
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from projectsmanagement.concurrency import WriterBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the SQLite profiles of settings.SQLITE_PROFILES under concurrent writers (issue creations) "
+        "and readers: write throughput and latency, and 'database is locked' errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default="bench_user_0", help="Author of the created issues.")
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=400, help="Issues created per profile.")
+        parser.add_argument("--readers", type=int, default=2)
+        parser.add_argument("--profiles", nargs="+", default=None, help="Profiles to compare (all by default).")
+        parser.add_argument("--output", help="File to write the JSON report to (standard output by default).")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Cette commande ne s'applique qu'aux bases SQLite.")
+        profiles = options["profiles"] or list(settings.SQLITE_PROFILES)
+        unknown = set(profiles) - set(settings.SQLITE_PROFILES)
+        if unknown:
+            raise CommandError(f"Profils inconnus: {', '.join(sorted(unknown))}.")
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"L'utilisateur {options['user']} n'existe pas.")
+
+        benchmark = WriterBenchmark(user, options["writers"], options["writes"], options["readers"])
+        results = {}
+        for profile in profiles:
+            results[profile] = benchmark.run(profile)
+            self.stderr.write(
+                f"{profile}: {results[profile]['writes_per_second']} écritures/s, "
+                f"{sum(results[profile]['write_errors'].values())} erreurs"
+            )
+
+        content = json.dumps(
+            {
+                "settings": {key: options[key] for key in ("writers", "writes", "readers")},
+                "profiles": results,
+            },
+            indent=2,
+            sort_keys=True,
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}."))
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement import export
+from projectsmanagement.models import Project
+
+
+class Command(BaseCommand):
+    help = "Stream the issues and comments of a project as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_id", type=int)
+        parser.add_argument("--format", choices=export.FORMATS, default="ndjson")
+        parser.add_argument("--output", help="Destination file (standard output by default).")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched from the database at a time.")
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options["project_id"])
+        except Project.DoesNotExist:
+            raise CommandError(f"Le projet {options['project_id']} n'existe pas.")
+
+        lines = export.render(project, options["format"], options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
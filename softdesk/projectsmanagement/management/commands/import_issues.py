@@ -0,0 +1,63 @@
+import os
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement.importer import Importer, read_records
+from projectsmanagement.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Import issues and comments from an NDJSON or CSV file (export_project format), in batches. "
+        "The number of records already imported is saved in a checkpoint file, so an interrupted "
+        "import resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("ndjson", "csv"), help="Deduced from the file extension by default.")
+        parser.add_argument("--project", type=int, help="Import every issue into this project.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--checkpoint", help="Checkpoint file (<path>.checkpoint by default).")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size doit être positif.")
+
+        project = None
+        if options["project"] is not None:
+            try:
+                project = Project.objects.get(pk=options["project"])
+            except Project.DoesNotExist:
+                raise CommandError(f"Le projet {options['project']} n'existe pas.")
+
+        done = 0
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                done = int(checkpoint.read().strip() or 0)
+            self.stdout.write(f"Reprise après {done} enregistrements.")
+
+        importer = Importer(project)
+        imported = 0
+        started = time.monotonic()
+        with open(path, encoding="utf-8", newline="") as file:
+            records = enumerate(read_records(file, input_format), start=1)
+            for _ in islice(records, done):
+                pass
+            while batch := list(islice(records, batch_size)):
+                imported += importer.import_batch(batch)
+                done = batch[-1][0]
+                with open(checkpoint_path, "w") as checkpoint:
+                    checkpoint.write(str(done))
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{done} enregistrements traités, {imported / elapsed:.0f} importés/s")
+
+        for number, error in importer.errors:
+            self.stderr.write(f"Enregistrement {number} ignoré : {error}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{imported} enregistrements importés, {len(importer.errors)} ignorés.")
+        )
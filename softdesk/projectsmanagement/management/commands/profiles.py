@@ -0,0 +1,34 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement import profiling
+
+
+class Command(BaseCommand):
+    help = "List the saved request profiles, or show the top functions of one of them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Profile to summarize (the most recent with 'latest').")
+        parser.add_argument("--limit", type=int, default=20, help="Number of functions to show.")
+        parser.add_argument("--sort", choices=["cumulative", "tottime", "calls"], default="cumulative")
+
+    def handle(self, *args, **options):
+        directory = profiling.get_config()["DIRECTORY"]
+        names = profiling.list_profiles(directory)
+
+        if not options["name"]:
+            if not names:
+                self.stdout.write(f"Aucun profil dans {directory}.")
+            for name in names:
+                size = os.path.getsize(os.path.join(directory, name))
+                self.stdout.write(f"{name} ({size // 1024} Ko)")
+            return
+
+        name = names[0] if options["name"] == "latest" and names else options["name"]
+        if name not in names:
+            raise CommandError(f"Le profil {name} n'existe pas dans {directory}.")
+
+        summary = profiling.summarize(os.path.join(directory, name), options["limit"], options["sort"])
+        self.stdout.write(f"{name}: {summary['total_time']:.3f} s")
+        self.stdout.write(f"{'appels':>10} {'tottime':>10} {'cumtime':>10}  fonction")
+        for row in summary["functions"]:
+            self.stdout.write(f"{row['calls']:>10} {row['tottime']:>10.4f} {row['cumtime']:>10.4f}  {row['function']}")
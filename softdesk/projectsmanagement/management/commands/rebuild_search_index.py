@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from projectsmanagement import search
+from projectsmanagement.models import Comment, Issue
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of issues and comments (after a backfill or a full VACUUM)."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("Full-text search requires SQLite FTS5.")
+
+        search.rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Index reconstruit : {Issue.objects.count()} issues et {Comment.objects.count()} commentaires."
+            )
+        )
@@ -0,0 +1,32 @@
+import json
+from django.core.management.base import BaseCommand
+from projectsmanagement import counters
+from projectsmanagement.models import Issue
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized counters (issues per status of the projects, comment count and last activity "
+        "of the issues) in bulk, report the drift and fix it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report the drift without fixing it.")
+        parser.add_argument("--projects", type=int, nargs="+", help="Ids of the projects to check (all by default).")
+        parser.add_argument("--output", help="File to write the JSON drift report to.")
+
+    def handle(self, *args, **options):
+        project_ids = options["projects"]
+        issue_ids = None
+        if project_ids is not None:
+            issue_ids = Issue.objects.filter(project_id__in=project_ids).values_list("id", flat=True)
+        drift = counters.reconcile(project_ids=project_ids, issue_ids=issue_ids, fix=not options["dry_run"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(json.dumps(drift, indent=2, sort_keys=True) + "\n")
+        summary = f"{len(drift['projects'])} projet(s) et {len(drift['issues'])} issue(s) décalé(s)"
+        if options["dry_run"] or not (drift["projects"] or drift["issues"]):
+            self.stdout.write(f"{summary}.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}, corrigé(s)."))
@@ -0,0 +1,107 @@
+import datetime
+import random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from projectsmanagement import counters
+from projectsmanagement.models import Comment, Issue, Project, ProjectContributor
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset for benchmarks: users, projects, contributors, issues and comments. "
+        "The first user (<prefix>0) authors the first project and contributes to every project, to play the heavy user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--projects", type=int, default=50)
+        parser.add_argument("--contributors", type=int, default=10, help="Contributors per project.")
+        parser.add_argument("--issues", type=int, default=100, help="Issues per project.")
+        parser.add_argument("--comments", type=int, default=3, help="Comments per issue.")
+        parser.add_argument("--prefix", default="bench_user_", help="Prefix of the generated usernames.")
+        parser.add_argument("--password", default="benchmark-password")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, for reproducible datasets.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        password = make_password(options["password"])
+
+        with transaction.atomic():
+            users = get_user_model().objects.bulk_create(
+                [
+                    get_user_model()(
+                        username=f"{options['prefix']}{index}",
+                        password=password,
+                        date_of_birth=datetime.date(1990, 1, 1),
+                        can_data_be_shared=index % 2 == 0,
+                    )
+                    for index in range(options["users"])
+                ],
+                batch_size=batch_size,
+            )
+            heavy_user = users[0]
+
+            projects = Project.objects.bulk_create(
+                [
+                    Project(
+                        name=f"Projet {index}",
+                        description="Projet généré pour les benchmarks.",
+                        author=heavy_user if index == 0 else rng.choice(users),
+                        type=rng.choice(Project.TYPE_CHOICES)[0],
+                    )
+                    for index in range(options["projects"])
+                ],
+                batch_size=batch_size,
+            )
+
+            members = {}
+            contributions = []
+            for project in projects:
+                sample = rng.sample(users, min(options["contributors"], len(users)))
+                members[project.id] = list({user.id: user for user in [project.author, heavy_user, *sample]}.values())
+                contributions += [ProjectContributor(project=project, user=user) for user in members[project.id]]
+            ProjectContributor.objects.bulk_create(contributions, batch_size=batch_size)
+
+            issues = Issue.objects.bulk_create(
+                [
+                    Issue(
+                        title=f"Issue {number} du projet {project.id}",
+                        description="Description générée pour les benchmarks. " * 5,
+                        project=project,
+                        author=rng.choice(members[project.id]),
+                        assignee=rng.choice([None, *members[project.id]]),
+                        status=rng.choice(Issue.STATUS_CHOICES)[0],
+                        priority=rng.choice(Issue.PRIORITY_CHOICES)[0],
+                        tag=rng.choice(Issue.TAG_CHOICES)[0],
+                    )
+                    for project in projects
+                    for number in range(options["issues"])
+                ],
+                batch_size=batch_size,
+            )
+
+            comments = Comment.objects.bulk_create(
+                (
+                    Comment(
+                        issue=issue,
+                        author=rng.choice(members[issue.project_id]),
+                        content=f"Commentaire {number} sur l'issue {issue.id}.",
+                    )
+                    for issue in issues
+                    for number in range(options["comments"])
+                ),
+                batch_size=batch_size,
+            )
+            # bulk_create does not send signals, the counters are computed once everything is written.
+            counters.reconcile()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(users)} utilisateurs, {len(projects)} projets, {len(contributions)} contributeurs, "
+                f"{len(issues)} issues et {len(comments)} commentaires créés."
+            )
+        )
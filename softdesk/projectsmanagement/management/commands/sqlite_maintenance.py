@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from projectsmanagement import search
+from projectsmanagement.sqlite import database_size, pragma
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the SQLite database: ANALYZE, PRAGMA optimize, incremental vacuum of the free pages "
+        "and WAL checkpoint. --vacuum runs a full VACUUM once, switching the database to incremental auto-vacuum, "
+        "and rebuilds the full-text indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--pages", type=int, default=0, help="Free pages to release with the incremental vacuum (0: all of them)."
+        )
+        parser.add_argument("--vacuum", action="store_true", help="Full VACUUM (locks the database while it runs).")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError("Cette commande ne s'applique qu'aux bases SQLite.")
+
+        size_before = database_size(connection)
+        free_pages = pragma(connection, "freelist_count")
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            cursor.execute("PRAGMA optimize")
+            self.stdout.write("Statistiques du planificateur mises à jour (ANALYZE, PRAGMA optimize).")
+
+            if options["vacuum"]:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+                self.stdout.write("VACUUM complet effectué, auto_vacuum incrémental activé.")
+                if search.is_available(connection):
+                    # VACUUM may renumber the implicit rowids the comment index is keyed on.
+                    search.rebuild_index(connection)
+                    self.stdout.write("Index de recherche reconstruits.")
+            elif pragma(connection, "auto_vacuum") == 2:
+                # execute() steps the pragma once, freeing a single page; executescript() runs it to the end.
+                connection.connection.executescript(f"PRAGMA incremental_vacuum({options['pages']});")
+                released = free_pages - pragma(connection, "freelist_count")
+                self.stdout.write(f"Vacuum incrémental: {released} pages libérées.")
+            else:
+                self.stdout.write(
+                    f"auto_vacuum n'est pas incrémental ({free_pages} pages libres), "
+                    "lancez une fois la commande avec --vacuum pour l'activer."
+                )
+
+            if pragma(connection, "journal_mode") == "wal":
+                cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                cursor.fetchall()
+                self.stdout.write("WAL reporté dans la base (checkpoint).")
+
+        size_after = database_size(connection)
+        self.stdout.write(
+            self.style.SUCCESS(f"Maintenance terminée: {size_before // 1024} Ko -> {size_after // 1024} Ko.")
+        )
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from softdesk.cachestats import CacheStats, register
+from .models import Project, ProjectContributor
+
+
+USER_PROJECTS_KEY = "membership:user:{}:projects"
+PROJECT_MEMBERS_KEY = "membership:project:{}:members"
+
+
+stats = register("membership", CacheStats())
+
+
+def _cache():
+    return caches[getattr(settings, "MEMBERSHIP_CACHE_ALIAS", "default")]
+
+
+def is_shared_cache(cache):
+    """
+    Return whether all the processes of the server see the same entries: the signals of one process
+    can't invalidate the local-memory cache of the others.
+    """
+    return not isinstance(cache, LocMemCache)
+
+
+def _timeout():
+    cache = _cache()
+    if not is_shared_cache(cache):
+        # A contributor removed by another worker keeps their access here until the entry expires.
+        return getattr(settings, "MEMBERSHIP_LOCAL_CACHE_TIMEOUT", 5)
+    return getattr(settings, "MEMBERSHIP_CACHE_TIMEOUT", 300)
+
+
+def _get_or_set(key, compute):
+    cache = _cache()
+    value = cache.get(key)
+    if value is not None:
+        stats.hit()
+        return value
+    stats.miss()
+    value = frozenset(compute())
+    cache.set(key, value, _timeout())
+    return value
+
+
+def get_user_project_ids(user_id):
+    """
+    Return the ids of the projects the user authored or contributes to.
+    """
+
+    def compute():
+        owned = Project.objects.filter(author_id=user_id).values_list("id", flat=True)
+        contributed = ProjectContributor.objects.filter(user_id=user_id).values_list("project_id", flat=True)
+        return owned.union(contributed)
+
+    return _get_or_set(USER_PROJECTS_KEY.format(user_id), compute)
+
+
+def get_project_member_ids(project_id):
+    """
+    Return the ids of the users who are the author or a contributor of the project.
+    """
+
+    def compute():
+        author = Project.objects.filter(id=project_id).values_list("author_id", flat=True)
+        contributors = ProjectContributor.objects.filter(project_id=project_id).values_list("user_id", flat=True)
+        return author.union(contributors)
+
+    return _get_or_set(PROJECT_MEMBERS_KEY.format(project_id), compute)
+
+
+def invalidate(user_ids=(), project_ids=()):
+    """
+    Drop the cached membership sets of the given users and projects, and again once the current
+    transaction commits: until then, concurrent requests don't see the change and may cache the old sets.
+    """
+    keys = [USER_PROJECTS_KEY.format(user_id) for user_id in user_ids]
+    keys += [PROJECT_MEMBERS_KEY.format(project_id) for project_id in project_ids]
+    if keys:
+        _cache().delete_many(keys)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: _cache().delete_many(keys))
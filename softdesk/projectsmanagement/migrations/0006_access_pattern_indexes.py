@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsmanagement', '0005_alter_comment_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issue',
+            name='tag',
+            field=models.CharField(choices=[('BUG', 'Bug'), ('TASK', 'Task'), ('FEATURE', 'Feature')], max_length=15),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'created_at'], name='comment_issue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'status', 'priority'], name='issue_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['assignee', 'status'], name='issue_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectcontributor',
+            index=models.Index(fields=['user', 'project'], name='contributor_user_project_idx'),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+ISSUE_SEARCH_TABLE = "projectsmanagement_issue_search"
+COMMENT_SEARCH_TABLE = "projectsmanagement_comment_search"
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {ISSUE_SEARCH_TABLE} USING fts5(
+        title, description,
+        content='projectsmanagement_issue', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {ISSUE_SEARCH_TABLE}_insert AFTER INSERT ON projectsmanagement_issue BEGIN
+        INSERT INTO {ISSUE_SEARCH_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {ISSUE_SEARCH_TABLE}_delete AFTER DELETE ON projectsmanagement_issue BEGIN
+        INSERT INTO {ISSUE_SEARCH_TABLE}({ISSUE_SEARCH_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {ISSUE_SEARCH_TABLE}_update AFTER UPDATE OF title, description ON projectsmanagement_issue BEGIN
+        INSERT INTO {ISSUE_SEARCH_TABLE}({ISSUE_SEARCH_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {ISSUE_SEARCH_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    # Comments have a UUID primary key, their index is keyed on the table's implicit rowid.
+    f"""
+    CREATE VIRTUAL TABLE {COMMENT_SEARCH_TABLE} USING fts5(
+        content,
+        content='projectsmanagement_comment', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {COMMENT_SEARCH_TABLE}_insert AFTER INSERT ON projectsmanagement_comment BEGIN
+        INSERT INTO {COMMENT_SEARCH_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {COMMENT_SEARCH_TABLE}_delete AFTER DELETE ON projectsmanagement_comment BEGIN
+        INSERT INTO {COMMENT_SEARCH_TABLE}({COMMENT_SEARCH_TABLE}, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {COMMENT_SEARCH_TABLE}_update AFTER UPDATE OF content ON projectsmanagement_comment BEGIN
+        INSERT INTO {COMMENT_SEARCH_TABLE}({COMMENT_SEARCH_TABLE}, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+        INSERT INTO {COMMENT_SEARCH_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {ISSUE_SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {ISSUE_SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {ISSUE_SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {ISSUE_SEARCH_TABLE}",
+    f"DROP TRIGGER IF EXISTS {COMMENT_SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {COMMENT_SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {COMMENT_SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {COMMENT_SEARCH_TABLE}",
+]
+
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+    for table in (ISSUE_SEARCH_TABLE, COMMENT_SEARCH_TABLE):
+        schema_editor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsmanagement', '0006_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
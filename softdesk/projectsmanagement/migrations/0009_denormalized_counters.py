@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:34
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Project = apps.get_model("projectsmanagement", "Project")
+    Issue = apps.get_model("projectsmanagement", "Issue")
+    Comment = apps.get_model("projectsmanagement", "Comment")
+
+    def count(queryset, field):
+        counts = queryset.values(field).annotate(count=Count("pk")).values("count")
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    status_fields = {"TODO": "todo_issue_count", "IN_PROGRESS": "in_progress_issue_count", "DONE": "done_issue_count"}
+    for status, field in status_fields.items():
+        Project.objects.update(**{field: count(Issue.objects.filter(project=OuterRef("pk"), status=status), "project")})
+    latest = Comment.objects.filter(issue=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+    Issue.objects.update(
+        comment_count=count(Comment.objects.filter(issue=OuterRef("pk")), "issue"), last_activity_at=Subquery(latest)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsmanagement', '0008_project_version_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='done_issue_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_issue_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_issue_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
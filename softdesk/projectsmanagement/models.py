@@ -16,6 +16,19 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="owned_projects")
     type = models.CharField(max_length=15, choices=TYPE_CHOICES)
+    # Bumped with updated_at whenever the project, its contributors or its issues change.
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=0)
+    # Issues per status, maintained by projectsmanagement.counters (reconcile_counters recomputes them).
+    todo_issue_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_issue_count = models.PositiveIntegerField(default=0, editable=False)
+    done_issue_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (cursor_ordering of the views).
+            models.Index(fields=["created_at", "id"], name="project_cursor_idx"),
+        ]
 
     def __str__(self):
         return f"{self.id} - {self.name}"
@@ -27,6 +40,9 @@ class ProjectContributor(models.Model):
 
     class Meta:
         unique_together = ("project", "user")
+        indexes = [
+            models.Index(fields=["user", "project"], name="contributor_user_project_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.project.name}"
@@ -60,6 +76,20 @@ class Issue(models.Model):
     tag = models.CharField(max_length=15, choices=TAG_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by projectsmanagement.counters; last_activity_at is the date of the latest comment.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Covers the GROUP BY of projectstats.compute, and the (project, status) filters as a prefix.
+            models.Index(fields=["project", "status", "priority", "tag", "assignee"], name="issue_project_stats_idx"),
+            models.Index(fields=["assignee", "status"], name="issue_assignee_status_idx"),
+            # Keyset pagination order, of all the visible issues, of one project's and of one assignee's.
+            models.Index(fields=["created_at", "id"], name="issue_cursor_idx"),
+            models.Index(fields=["project", "created_at", "id"], name="issue_project_cursor_idx"),
+            models.Index(fields=["assignee", "created_at", "id"], name="issue_assignee_cursor_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -71,6 +101,14 @@ class Comment(models.Model):
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order, of all the visible comments and of one issue's.
+            models.Index(fields=["created_at", "id"], name="comment_cursor_idx"),
+            models.Index(fields=["issue", "created_at", "id"], name="comment_issue_cursor_idx"),
+        ]
 
     def __str__(self):
         return f"Comment {self.id} par {self.author.username} sur {self.issue.title}"
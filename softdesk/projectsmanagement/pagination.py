@@ -0,0 +1,54 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on a stable, indexed key: each page costs one range query, without COUNT(*) or OFFSET.
+    The ordering comes from the view's ``cursor_ordering`` attribute; the models index it (the *_cursor_idx
+    indexes), so that a page is read in index order instead of sorting the whole list.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, "cursor_ordering", self.ordering))
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination by default, so existing clients keep working.
+    Clients opt in to keyset pagination with ``?pagination=cursor`` and then follow the opaque
+    ``next``/``previous`` links, which carry a ``cursor`` parameter.
+    A count already computed by the view (``view.list_count``) is reused instead of a new COUNT(*).
+    """
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        self.known_count = getattr(view, "list_count", None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        if self.known_count is not None:
+            return self.known_count
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
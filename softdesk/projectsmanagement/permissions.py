@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from .models import ProjectContributor
+from .authorization import get_authorization
 
 
 class IsProjectContributor(permissions.BasePermission):
@@ -11,9 +11,7 @@ class IsProjectContributor(permissions.BasePermission):
         """
         Checks if the user is a contributor of the project.
         """
-        if request.user == obj.author:
-            return True
-        return ProjectContributor.objects.filter(project=obj, user=request.user).exists()
+        return get_authorization(request).can_view_project(obj.id)
 
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
@@ -24,4 +22,4 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.author == request.user
+        return obj.author_id == request.user.id
@@ -0,0 +1,163 @@
+import cProfile
+import os
+import pstats
+import random
+import threading
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from authentication.authentication import CachedJWTAuthentication
+from .instrumentation import get_view_name
+
+DEFAULTS = {
+    "ENABLED": False,
+    "DIRECTORY": "profiles",
+    "SAMPLE_RATE": 0.0,
+    "HEADER": "HTTP_X_PROFILE",
+    "QUERY_PARAM": "profile",
+}
+
+
+# Since Python 3.12 only one profiler can be active at a time in the process: a request asking for
+# a profile while another one is profiled is served unprofiled.
+profiler_lock = threading.Lock()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+
+
+def get_staff_user(request):
+    """
+    The staff user sending the request, from the session or the JWT (the JWT is otherwise
+    only read by the views), None for anybody else.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        try:
+            authenticated = CachedJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        user = authenticated[0] if authenticated else None
+    return user if user is not None and user.is_staff else None
+
+
+def profile_requested(request, config):
+    flag = request.META.get(config["HEADER"]) or request.GET.get(config["QUERY_PARAM"])
+    return flag not in (None, "", "0", "false")
+
+
+def start_profiler():
+    """
+    An enabled profiler, or None when another request is being profiled (or another profiling tool is active).
+    """
+    if not profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        profiler_lock.release()
+        return None
+    return profiler
+
+
+def stop_profiler(profiler):
+    profiler.disable()
+    profiler_lock.release()
+
+
+def profile_path(directory, view_name):
+    timestamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    return os.path.join(directory, f"{view_name or 'unknown'}-{timestamp}.prof")
+
+
+class ProfilingMiddleware:
+    """
+    Run the request under cProfile when a staff user asks for it with the X-Profile header or
+    the ?profile=1 query parameter, for PROFILING["SAMPLE_RATE"] of those requests. The profile is
+    saved as "<view name>-<timestamp>.prof" in PROFILING["DIRECTORY"], named in the X-Profile-Id header.
+    The content of streaming responses is produced after the profile is saved. Under ASGI only the
+    event loop thread is profiled, with whatever else it runs in the meantime. One request is profiled
+    at a time, the ones overlapping it are served unprofiled.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = get_config()
+        if not self.should_profile(request, config) or get_staff_user(request) is None:
+            return self.get_response(request)
+
+        profiler = start_profiler()
+        if profiler is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_profiler(profiler)
+        return self.save(profiler, request, response, config)
+
+    async def __acall__(self, request):
+        config = get_config()
+        if not self.should_profile(request, config) or await sync_to_async(get_staff_user)(request) is None:
+            return await self.get_response(request)
+
+        profiler = start_profiler()
+        if profiler is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_profiler(profiler)
+        return self.save(profiler, request, response, config)
+
+    def should_profile(self, request, config):
+        return config["ENABLED"] and profile_requested(request, config) and random.random() < config["SAMPLE_RATE"]
+
+    def save(self, profiler, request, response, config):
+        os.makedirs(config["DIRECTORY"], exist_ok=True)
+        path = profile_path(config["DIRECTORY"], get_view_name(request))
+        profiler.dump_stats(path)
+        response["X-Profile-Id"] = os.path.basename(path)
+        return response
+
+
+def list_profiles(directory=None):
+    """
+    Names of the saved profiles, most recent first.
+    """
+    directory = directory or get_config()["DIRECTORY"]
+    if not os.path.isdir(directory):
+        return []
+    names = [name for name in os.listdir(directory) if name.endswith(".prof")]
+    return sorted(names, key=lambda name: os.path.getmtime(os.path.join(directory, name)), reverse=True)
+
+
+def summarize(path, limit=20, sort="cumulative"):
+    """
+    The top "limit" functions of a profile, as dicts, sorted by cumulative ("cumulative")
+    or own ("tottime") time, or by number of calls ("calls").
+    """
+    stats = pstats.Stats(path)
+    rows = [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    key = {"cumulative": "cumtime", "tottime": "tottime", "calls": "calls"}[sort]
+    rows.sort(key=lambda row: row[key], reverse=True)
+    return {"total_time": round(stats.total_tt, 6), "functions": rows[:limit]}
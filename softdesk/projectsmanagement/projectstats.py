@@ -0,0 +1,100 @@
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from authentication.usercache import get_users
+from softdesk.cachestats import CacheStats, register
+from .models import Issue
+
+DIMENSIONS = ("status", "priority", "tag", "assignee_id")
+
+STATS_KEY = "project-stats:{}:{}"
+
+
+stats = register("project-stats", CacheStats())
+
+
+def _settings():
+    return getattr(settings, "PROJECT_STATS_CACHE", {})
+
+
+def _cache():
+    return caches[_settings().get("ALIAS", "default")]
+
+
+def compute(project_ids):
+    """
+    Count the issues of the projects per status, priority, tag and assignee id with a single GROUP BY query.
+    Return {project id: {dimension: {value: count}}}.
+    """
+    histograms = {project_id: {dimension: Counter() for dimension in DIMENSIONS} for project_id in project_ids}
+    rows = (
+        Issue.objects.filter(project_id__in=project_ids)
+        .values_list("project_id", *DIMENSIONS)
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for project_id, *values, count in rows:
+        for dimension, value in zip(DIMENSIONS, values):
+            histograms[project_id][dimension][value] += count
+    return {
+        project_id: {dimension: dict(counts) for dimension, counts in histogram.items()}
+        for project_id, histogram in histograms.items()
+    }
+
+
+def get_histograms(projects):
+    """
+    The histograms of the projects, cached under their version (bumped by every issue write, bulk ones included)
+    so that a changed project never hits a stale entry. The missing ones are computed with one query.
+    """
+    enabled = _settings().get("ENABLED", True)
+    keys = {STATS_KEY.format(project.id, project.version): project.id for project in projects}
+    histograms = {keys[key]: histogram for key, histogram in (_cache().get_many(keys) if enabled else {}).items()}
+    missing = [project_id for project_id in keys.values() if project_id not in histograms]
+    for _ in histograms:
+        stats.hit()
+    for _ in missing:
+        stats.miss()
+
+    if missing:
+        computed = compute(missing)
+        histograms.update(computed)
+        if enabled:
+            entries = {key: computed[project_id] for key, project_id in keys.items() if project_id in computed}
+            _cache().set_many(entries, _settings().get("TIMEOUT", 300))
+    return histograms
+
+
+def merge(histograms):
+    """
+    Sum the histograms of several projects.
+    """
+    total = {dimension: Counter() for dimension in DIMENSIONS}
+    for histogram in histograms:
+        for dimension in DIMENSIONS:
+            total[dimension].update(histogram[dimension])
+    return total
+
+
+def render(histogram):
+    """
+    API representation of a histogram: the count of every status, priority and tag, and the assignees
+    by username, most loaded first (null for the unassigned issues).
+    """
+    users = get_users([user_id for user_id in histogram["assignee_id"] if user_id is not None])
+    assignees = Counter()
+    for user_id, count in histogram["assignee_id"].items():
+        # A deleted assignee is unassigned by an UPDATE that doesn't touch the project.
+        user = users.get(user_id)
+        assignees[user.username if user is not None else None] += count
+    return {
+        "total": sum(histogram["status"].values()),
+        "status": {value: histogram["status"].get(value, 0) for value, _ in Issue.STATUS_CHOICES},
+        "priority": {value: histogram["priority"].get(value, 0) for value, _ in Issue.PRIORITY_CHOICES},
+        "tag": {value: histogram["tag"].get(value, 0) for value, _ in Issue.TAG_CHOICES},
+        "assignee": [
+            {"assignee": username, "count": count}
+            for username, count in sorted(assignees.items(), key=lambda item: (-item[1], item[0] or ""))
+        ],
+    }
@@ -0,0 +1,67 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.utils.encoders import JSONEncoder
+from softdesk.cachestats import CacheStats, register
+
+
+class ResponseCacheStats(CacheStats):
+    """
+    Hit/miss counters plus the number of serialized bytes served from the cache.
+    """
+
+    def reset(self):
+        super().reset()
+        self.bytes_saved = 0
+
+    def saved(self, size):
+        with self._lock:
+            self.bytes_saved += size
+
+    def as_dict(self):
+        stats = super().as_dict()
+        with self._lock:
+            stats["bytes_saved"] = self.bytes_saved
+        return stats
+
+
+stats = register("project-detail", ResponseCacheStats())
+
+
+def _settings():
+    return getattr(settings, "PROJECT_DETAIL_CACHE", {})
+
+
+def _cache():
+    return caches[_settings().get("ALIAS", "default")]
+
+
+def make_key(project_id, version, query_string=""):
+    """
+    Key a project detail by its version stamp, so a bumped project never hits a stale entry.
+    """
+    variant = hashlib.md5(query_string.encode()).hexdigest()[:12]
+    return f"project-detail:{project_id}:{version}:{variant}"
+
+
+def get_or_serialize(key, serialize):
+    """
+    Return the cached serialized data for the key, or serialize and store it.
+    """
+    if not _settings().get("ENABLED", True):
+        return serialize()
+
+    cache = _cache()
+    entry = cache.get(key)
+    if entry is not None:
+        data, size = entry
+        stats.hit()
+        stats.saved(size)
+        return data
+
+    stats.miss()
+    data = dict(serialize())
+    size = len(json.dumps(data, cls=JSONEncoder).encode())
+    cache.set(key, (data, size), _settings().get("TIMEOUT", 300))
+    return data
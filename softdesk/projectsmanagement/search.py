@@ -0,0 +1,213 @@
+import html
+import re
+import uuid
+from django.db import connection
+from .utils import get_viewable_projects
+
+
+# FTS5 external-content tables: the text stays in the issue and comment tables and the indexes are
+# kept in sync by triggers, so bulk_create, update() and raw SQL writes are covered too.
+ISSUE_SEARCH_TABLE = "projectsmanagement_issue_search"
+COMMENT_SEARCH_TABLE = "projectsmanagement_comment_search"
+SEARCH_TABLES = (ISSUE_SEARCH_TABLE, COMMENT_SEARCH_TABLE)
+
+# Every full-text table and trigger. The statements are written as in migration 0007, SQLite keeps their
+# text in sqlite_master: a database migrated from scratch and one repaired by install_search_index()
+# end up with the same schema.
+SEARCH_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE {ISSUE_SEARCH_TABLE} USING fts5(
+        title, description,
+        content='projectsmanagement_issue', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {ISSUE_SEARCH_TABLE}_insert AFTER INSERT ON projectsmanagement_issue BEGIN
+        INSERT INTO {ISSUE_SEARCH_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {ISSUE_SEARCH_TABLE}_delete AFTER DELETE ON projectsmanagement_issue BEGIN
+        INSERT INTO {ISSUE_SEARCH_TABLE}({ISSUE_SEARCH_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {ISSUE_SEARCH_TABLE}_update AFTER UPDATE OF title, description ON projectsmanagement_issue BEGIN
+        INSERT INTO {ISSUE_SEARCH_TABLE}({ISSUE_SEARCH_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {ISSUE_SEARCH_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    # Comments have a UUID primary key, their index is keyed on the table's implicit rowid.
+    f"""
+    CREATE VIRTUAL TABLE {COMMENT_SEARCH_TABLE} USING fts5(
+        content,
+        content='projectsmanagement_comment', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {COMMENT_SEARCH_TABLE}_insert AFTER INSERT ON projectsmanagement_comment BEGIN
+        INSERT INTO {COMMENT_SEARCH_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {COMMENT_SEARCH_TABLE}_delete AFTER DELETE ON projectsmanagement_comment BEGIN
+        INSERT INTO {COMMENT_SEARCH_TABLE}({COMMENT_SEARCH_TABLE}, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {COMMENT_SEARCH_TABLE}_update AFTER UPDATE OF content ON projectsmanagement_comment BEGIN
+        INSERT INTO {COMMENT_SEARCH_TABLE}({COMMENT_SEARCH_TABLE}, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+        INSERT INTO {COMMENT_SEARCH_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+]
+
+
+def _schema_name(sql):
+    return re.search(r"CREATE (?:VIRTUAL TABLE|TRIGGER) (\w+)", sql)[1]
+
+
+# The snippets are built with control characters around the matches, replaced by <mark> tags once
+# the text is HTML-escaped.
+MARK_START = "\x02"
+MARK_END = "\x03"
+SNIPPET_ARGS = "char(2), char(3), '…', 16"
+
+
+def is_available(using=connection):
+    """
+    Full-text search relies on SQLite FTS5.
+    """
+    return using.vendor == "sqlite"
+
+
+def rebuild_index(using=connection):
+    """
+    Rebuild both full-text indexes from the issue and comment tables.
+    Needed after a full VACUUM, which may renumber the implicit rowids the comment index is keyed on.
+    """
+    with using.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def install_search_index(using=connection):
+    """
+    Create the missing full-text tables and triggers, then rebuild the indexes if anything was missing.
+    Migration 0007 creates them, but SQLite drops the triggers of a table when a later migration rebuilds it
+    (and renumbers its implicit rowids), so this runs after every migrate.
+    """
+    if not is_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        if not {"projectsmanagement_issue", "projectsmanagement_comment"} <= existing:
+            return
+        missing = [sql for sql in SEARCH_SCHEMA if _schema_name(sql) not in existing]
+        for sql in missing:
+            cursor.execute(sql)
+    if missing:
+        rebuild_index(using)
+
+
+def to_match_expression(text):
+    """
+    Turn free text into an FTS5 expression matching every word, so user input
+    can never be interpreted as FTS5 syntax.
+    """
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in text.split()]
+    return " ".join(terms)
+
+
+def render_snippet(snippet):
+    """
+    HTML-escape a snippet of user content and highlight its matches with <mark> tags.
+    """
+    return html.escape(snippet or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def add_scores(results):
+    """
+    Set the "score" of results from one table: their bm25 rank relative to the best one (1 for the best match,
+    closer to 0 for worse ones). Ranks of the issue and comment indexes are not on the same scale,
+    the scores can be compared.
+    """
+    best = min((result["rank"] for result in results), default=0)
+    for result in results:
+        result["score"] = result["rank"] / best if best else 1.0
+    return results
+
+
+def _viewable_projects_sql(user):
+    return get_viewable_projects(user).values("id").query.sql_with_params()
+
+
+def search_issues(user, text, limit):
+    """
+    Return the issues of the projects viewable by the user matching the text, best match first, with their score.
+    """
+    projects_sql, projects_params = _viewable_projects_sql(user)
+    sql = f"""
+        SELECT issue.id, issue.project_id, issue.title,
+               snippet({ISSUE_SEARCH_TABLE}, -1, {SNIPPET_ARGS}), {ISSUE_SEARCH_TABLE}.rank
+        FROM {ISSUE_SEARCH_TABLE}
+        JOIN projectsmanagement_issue issue ON issue.id = {ISSUE_SEARCH_TABLE}.rowid
+        WHERE {ISSUE_SEARCH_TABLE} MATCH %s AND issue.project_id IN ({projects_sql})
+        ORDER BY {ISSUE_SEARCH_TABLE}.rank
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [to_match_expression(text), *projects_params, limit])
+        return add_scores(
+            [
+                {
+                    "type": "issue",
+                    "id": row[0],
+                    "project": row[1],
+                    "title": row[2],
+                    "snippet": render_snippet(row[3]),
+                    "rank": row[4],
+                }
+                for row in cursor.fetchall()
+            ]
+        )
+
+
+def search_comments(user, text, limit):
+    """
+    Return the comments of the projects viewable by the user matching the text, best match first,
+    with their score.
+    """
+    projects_sql, projects_params = _viewable_projects_sql(user)
+    sql = f"""
+        SELECT comment.id, comment.issue_id, issue.project_id,
+               snippet({COMMENT_SEARCH_TABLE}, -1, {SNIPPET_ARGS}), {COMMENT_SEARCH_TABLE}.rank
+        FROM {COMMENT_SEARCH_TABLE}
+        JOIN projectsmanagement_comment comment ON comment.rowid = {COMMENT_SEARCH_TABLE}.rowid
+        JOIN projectsmanagement_issue issue ON issue.id = comment.issue_id
+        WHERE {COMMENT_SEARCH_TABLE} MATCH %s AND issue.project_id IN ({projects_sql})
+        ORDER BY {COMMENT_SEARCH_TABLE}.rank
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [to_match_expression(text), *projects_params, limit])
+        return add_scores(
+            [
+                {
+                    "type": "comment",
+                    "id": str(uuid.UUID(row[0])),
+                    "issue": row[1],
+                    "project": row[2],
+                    "snippet": render_snippet(row[3]),
+                    "rank": row[4],
+                }
+                for row in cursor.fetchall()
+            ]
+        )
@@ -1,18 +1,71 @@
 from .models import Project, Issue, Comment, ProjectContributor
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .utils import check_contributors
+from authentication.usercache import get_user_by_username
+from .authorization import get_authorization
+from softdesk.fieldsets import SparseFieldsetSerializerMixin
+from .membership import get_project_member_ids
+
+
+class PrefetchedRelatedFieldMixin:
+    """
+    Resolve the related instance from ``context["prefetched"][<field name>]``, a {value: instance}
+    dict filled by views that validate many items at once, instead of running one query per value.
+    Unknown values fall back to the regular lookup (and its error messages).
+    """
+
+    def to_prefetched_key(self, data):
+        return data
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get("prefetched", {}).get(self.field_name)
+        if prefetched is not None:
+            try:
+                return prefetched[self.to_prefetched_key(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class PrefetchedPrimaryKeyRelatedField(PrefetchedRelatedFieldMixin, serializers.PrimaryKeyRelatedField):
+
+    def to_prefetched_key(self, data):
+        return int(data)
+
+
+class UsernameRelatedField(serializers.SlugRelatedField):
+    """
+    A user given by its username, resolved through the user cache.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("slug_field", "username")
+        if not kwargs.get("read_only"):
+            kwargs.setdefault("queryset", get_user_model().objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            return super().to_internal_value(data)
+        user = get_user_by_username(data)
+        if user is None:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=data)
+        return user
+
+
+class PrefetchedUsernameRelatedField(PrefetchedRelatedFieldMixin, UsernameRelatedField):
+    pass
 
 
 class ProjectContributorSerializer(serializers.ModelSerializer):
-    user = serializers.SlugRelatedField(slug_field="username", queryset=get_user_model().objects.all())
+    user = UsernameRelatedField()
 
     class Meta:
         model = ProjectContributor
         fields = ["user"]
 
 
-class CommentListSerializer(serializers.ModelSerializer):
+class CommentListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source="author.username")
     issue = serializers.PrimaryKeyRelatedField(queryset=Issue.objects.all())
 
@@ -21,7 +74,7 @@ class CommentListSerializer(serializers.ModelSerializer):
         fields = ["id", "issue", "author"]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source="author.username")
     issue = serializers.PrimaryKeyRelatedField(queryset=Issue.objects.all())
 
@@ -30,11 +83,9 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ["id", "issue", "author", "content", "created_at"]
 
 
-class IssueListSerializer(serializers.ModelSerializer):
+class IssueListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source="author.username")
-    assignee = serializers.SlugRelatedField(
-        slug_field="username", queryset=get_user_model().objects.all(), required=False, allow_null=True
-    )
+    assignee = UsernameRelatedField(required=False, allow_null=True)
 
     class Meta:
         model = Issue
@@ -44,15 +95,15 @@ class IssueListSerializer(serializers.ModelSerializer):
             "author",
             "assignee",
             "priority",
+            "comment_count",
+            "last_activity_at",
         ]
 
 
-class IssueSerializer(serializers.ModelSerializer):
+class IssueSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source="author.username")
-    assignee = serializers.SlugRelatedField(
-        slug_field="username", queryset=get_user_model().objects.all(), required=False, allow_null=True
-    )
-    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
+    assignee = PrefetchedUsernameRelatedField(required=False, allow_null=True)
+    project = PrefetchedPrimaryKeyRelatedField(queryset=Project.objects.all())
 
     class Meta:
         model = Issue
@@ -69,27 +120,31 @@ class IssueSerializer(serializers.ModelSerializer):
             "created_at",
         ]
 
-    def validate_assignee(self, value):
+    def validate(self, attrs):
         """Ensure the assignee is a contributor of the project's issue."""
-        project = self.instance.project if self.instance else self.initial_data.get("project")
+        if "assignee" not in attrs and "project" not in attrs:
+            return attrs
 
-        if not project:
-            raise serializers.ValidationError("Vous devez spécifier un projet auquel l'issue est rattachée.")
+        if "assignee" in attrs:
+            assignee_id = attrs["assignee"].id if attrs["assignee"] is not None else None
+        else:
+            assignee_id = getattr(self.instance, "assignee_id", None)
+        # Ids only: the project of the instance is not loaded.
+        project_id = attrs["project"].id if "project" in attrs else getattr(self.instance, "project_id", None)
 
-        if isinstance(project, int) or isinstance(project, str):
-            try:
-                project = Project.objects.get(id=project)
-            except Project.DoesNotExist:
-                raise serializers.ValidationError("Le projet n'existe pas.")
+        if assignee_id is not None and project_id is not None and not self.is_member(assignee_id, project_id):
+            raise serializers.ValidationError({"assignee": "L'assignee doit être un contributeur du projet."})
 
-        contributors_list = check_contributors(project)
-        if value not in contributors_list:
-            raise serializers.ValidationError("L'assignee doit être un contributeur du projet.")
+        return attrs
 
-        return value
+    def is_member(self, user_id, project_id):
+        request = self.context.get("request")
+        if request is None:
+            return user_id in get_project_member_ids(project_id)
+        return get_authorization(request).is_member(user_id, project_id)
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(slug_field="username", read_only=True)
     contributors = serializers.SerializerMethodField()
     issues = IssueListSerializer(many=True, read_only=True)
@@ -105,13 +160,21 @@ class ProjectSerializer(serializers.ModelSerializer):
         return [contributor.user.username for contributor in obj.contributors.all()]
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(slug_field="username", read_only=True)
     contributors = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = ["id", "name", "author", "contributors"]
+        fields = [
+            "id",
+            "name",
+            "author",
+            "contributors",
+            "todo_issue_count",
+            "in_progress_issue_count",
+            "done_issue_count",
+        ]
 
     def get_contributors(self, obj):
         """
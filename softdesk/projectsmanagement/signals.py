@@ -0,0 +1,127 @@
+from collections import Counter
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .membership import invalidate
+from .search import install_search_index
+from . import counters
+from .models import Comment, Project, ProjectContributor, Issue
+from .versioning import touch_projects
+
+
+@receiver(post_save, sender=ProjectContributor)
+@receiver(post_delete, sender=ProjectContributor)
+def invalidate_contributor_membership(sender, instance, **kwargs):
+    """
+    Adding or removing a contributor changes both the user's and the project's membership.
+    """
+    invalidate(user_ids=[instance.user_id], project_ids=[instance.project_id])
+    if not isinstance(kwargs.get("origin"), Project):
+        touch_projects([instance.project_id])
+
+
+@receiver(post_init, sender=Project)
+def remember_loaded_author(sender, instance, **kwargs):
+    """
+    Keep track of the loaded author so an author change can be detected after saving.
+    """
+    instance._loaded_author_id = instance.__dict__.get("author_id")
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_membership(sender, instance, created, **kwargs):
+    loaded_author_id = instance._loaded_author_id
+    if created:
+        invalidate(user_ids=[instance.author_id])
+    elif loaded_author_id != instance.author_id:
+        invalidate(user_ids=[loaded_author_id, instance.author_id], project_ids=[instance.pk])
+    instance._loaded_author_id = instance.author_id
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_deleted_project_membership(sender, instance, **kwargs):
+    invalidate(user_ids=[instance.author_id], project_ids=[instance.pk])
+
+
+def deleted_along_with(kwargs, *models):
+    """
+    True if the deletion was started by an instance or a queryset of one of the models.
+    """
+    origin = kwargs.get("origin")
+    return (origin.model if isinstance(origin, QuerySet) else type(origin)) in models
+
+
+@receiver(post_init, sender=Issue)
+def remember_loaded_project(sender, instance, **kwargs):
+    """
+    Keep track of the loaded project and status so both projects are touched, and the issue counters
+    of both projects and statuses updated, when an issue is moved.
+    """
+    instance._loaded_project_id = instance.__dict__.get("project_id")
+    instance._loaded_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=Issue)
+def touch_issue_project(sender, instance, created, **kwargs):
+    touch_projects([instance._loaded_project_id, instance.project_id])
+    if created:
+        counters.update_issue_counts(Counter({(instance.project_id, instance.status): 1}))
+    else:
+        counters.update_issue_counts(counters.issue_moves([instance]))
+    instance._loaded_project_id = instance.project_id
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Issue)
+def touch_deleted_issue_project(sender, instance, **kwargs):
+    # Issues deleted along with their project have no project left to touch.
+    if not deleted_along_with(kwargs, Project):
+        touch_projects([instance.project_id])
+        counters.update_issue_counts(Counter({(instance.project_id, instance.status): -1}))
+
+
+def comment_project_id(comment):
+    if Comment.issue.is_cached(comment):
+        return comment.issue.project_id
+    return Issue.objects.filter(pk=comment.issue_id).values_list("project_id", flat=True).first()
+
+
+@receiver(post_init, sender=Comment)
+def remember_loaded_issue(sender, instance, **kwargs):
+    instance._loaded_issue_id = instance.__dict__.get("issue_id")
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    """
+    Count new and moved comments on their issue, and touch the project: its detail shows the counters.
+    """
+    if created:
+        counters.add_comment(instance.issue_id, instance.created_at)
+        touch_projects([comment_project_id(instance)])
+    elif instance._loaded_issue_id not in (None, instance.issue_id):
+        counters.remove_comment(instance._loaded_issue_id)
+        counters.add_comment(instance.issue_id, instance.created_at)
+        issues = Issue.objects.filter(id__in=[instance._loaded_issue_id, instance.issue_id])
+        touch_projects(issues.values_list("project_id", flat=True))
+    instance._loaded_issue_id = instance.issue_id
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comment(sender, instance, **kwargs):
+    if not deleted_along_with(kwargs, Issue, Project):
+        counters.remove_comment(instance.issue_id)
+        touch_projects([comment_project_id(instance)])
+
+
+def repair_search_index(sender, using, **kwargs):
+    """
+    Reinstall the full-text triggers dropped by migrations that rebuilt the issue or comment table,
+    unless migration 0007, which creates the index, has been unapplied.
+    Connected in ProjectsManagementConfig.ready().
+    """
+    connection = connections[using]
+    if ("projectsmanagement", "0007_search_index") in MigrationRecorder(connection).applied_migrations():
+        install_search_index(connection)
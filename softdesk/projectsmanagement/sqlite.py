@@ -0,0 +1,26 @@
+import os
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    connection_created receiver running the settings.SQLITE_PRAGMAS on new SQLite connections.
+    The pragmas go through the DB-API connection, so they don't count as queries of the request.
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+        connection.connection.execute(f"PRAGMA {name} = {value}").fetchall()
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def database_size(connection):
+    name = connection.settings_dict["NAME"]
+    files = [str(name), f"{name}-wal"]
+    return sum(os.path.getsize(path) for path in files if os.path.exists(path))
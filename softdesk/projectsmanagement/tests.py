@@ -1,3 +1,1406 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIClient
+from authentication.tokens import VersionedRefreshToken
+from softdesk import cachestats
+from . import checks, counters, membership, profiling, responsecache, search, sqlite
+from .benchmark import SCENARIOS, Benchmark
+from .instrumentation import QueryBudgetTestMixin
+from .membership import PROJECT_MEMBERS_KEY, USER_PROJECTS_KEY, get_project_member_ids, get_user_project_ids, stats
+from .models import Project, Issue, Comment, ProjectContributor
+from .utils import get_viewable_projects
 
-# Create your tests here.
+
+def create_user(username):
+    return get_user_model().objects.create(username=username, date_of_birth=datetime.date(1990, 1, 1))
+
+
+def create_project(author, name="Projet"):
+    project = Project.objects.create(name=name, description="Description", author=author, type="BACK_END")
+    ProjectContributor.objects.create(project=project, user=author)
+    return project
+
+
+def query_plan(sql):
+    """
+    EXPLAIN QUERY PLAN of a captured SQLite query, one line per step.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class CacheResetMixin:
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        cachestats.reset_all()
+
+
+class CacheResetTestCase(CacheResetMixin, TestCase):
+    pass
+
+
+class ProjectVisibilityTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user("alice")
+        self.other = create_user("bob")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_viewable_projects_owner_or_contributor(self):
+        owned = create_project(self.user, "owned")
+        shared = create_project(self.other, "shared")
+        ProjectContributor.objects.create(project=shared, user=self.user)
+        hidden = create_project(self.other, "hidden")
+
+        viewable = set(get_viewable_projects(self.user))
+
+        self.assertEqual(viewable, {owned, shared})
+        self.assertNotIn(hidden, viewable)
+
+    def test_issue_list_query_count_is_flat(self):
+        """
+        The issue list must cost the same number of queries whatever the user's membership size.
+        """
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get("/api/issues/")
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        project = create_project(self.other, "first")
+        ProjectContributor.objects.create(project=project, user=self.user)
+        Issue.objects.create(title="Issue", description="Desc", project=project, author=self.other, tag="BUG")
+        small = count_queries()
+
+        for index in range(200):
+            project = create_project(self.other, f"project {index}")
+            ProjectContributor.objects.create(project=project, user=self.user)
+
+        self.assertEqual(count_queries(), small)
+
+    def test_visibility_benchmark_across_membership_sizes(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "visibility.json")
+
+        call_command("benchmark_visibility", sizes=[1, 50], iterations=2, output=output, stdout=io.StringIO())
+
+        with open(output) as report_file:
+            report = json.load(report_file)
+        small, large = report["sizes"]["1"], report["sizes"]["50"]
+        for route in ("projects-list", "issues-list", "comments-list"):
+            self.assertEqual(large[route]["status"], 200)
+            self.assertEqual(large[route]["queries"], small[route]["queries"], route)
+            self.assertGreater(large[route]["p95_ms"], 0)
+        # The benchmark data is rolled back.
+        self.assertFalse(Project.objects.exists())
+        self.assertFalse(get_user_model().objects.filter(username__startswith="visibility_").exists())
+
+
+class MembershipCacheTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.user = create_user("bob")
+        self.project = create_project(self.author)
+
+    def test_second_lookup_is_served_from_cache(self):
+        get_user_project_ids(self.author.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_project_ids(self.author.id), {self.project.id})
+        self.assertEqual(stats.as_dict()["hits"], 1)
+        self.assertEqual(stats.as_dict()["misses"], 1)
+
+    def test_contributor_changes_invalidate(self):
+        self.assertNotIn(self.project.id, get_user_project_ids(self.user.id))
+        self.assertNotIn(self.user.id, get_project_member_ids(self.project.id))
+
+        contribution = ProjectContributor.objects.create(project=self.project, user=self.user)
+        self.assertIn(self.project.id, get_user_project_ids(self.user.id))
+        self.assertIn(self.user.id, get_project_member_ids(self.project.id))
+
+        contribution.delete()
+        self.assertNotIn(self.project.id, get_user_project_ids(self.user.id))
+        self.assertNotIn(self.user.id, get_project_member_ids(self.project.id))
+
+    def test_invalidated_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectContributor.objects.create(project=self.project, user=self.user)
+            # A concurrent request, which doesn't see the new contributor yet, caches the old sets.
+            caches["default"].set(USER_PROJECTS_KEY.format(self.user.id), frozenset())
+            caches["default"].set(PROJECT_MEMBERS_KEY.format(self.project.id), frozenset([self.author.id]))
+
+        self.assertIn(self.project.id, get_user_project_ids(self.user.id))
+        self.assertIn(self.user.id, get_project_member_ids(self.project.id))
+
+    def test_author_change_and_deletion_invalidate(self):
+        ProjectContributor.objects.filter(project=self.project).delete()
+        self.assertIn(self.author.id, get_project_member_ids(self.project.id))
+
+        self.project.author = self.user
+        self.project.save()
+        self.assertEqual(get_project_member_ids(self.project.id), {self.user.id})
+        self.assertNotIn(self.project.id, get_user_project_ids(self.author.id))
+        self.assertIn(self.project.id, get_user_project_ids(self.user.id))
+
+        project_id = self.project.id
+        self.project.delete()
+        self.assertNotIn(project_id, get_user_project_ids(self.user.id))
+
+    def test_local_memory_entries_expire_quickly(self):
+        # Another worker may have removed the contributor: its signals don't reach this process' cache.
+        self.assertEqual(membership._timeout(), settings.MEMBERSHIP_LOCAL_CACHE_TIMEOUT)
+        with override_settings(MEMBERSHIP_LOCAL_CACHE_TIMEOUT=0):
+            get_user_project_ids(self.user.id)
+            ProjectContributor.objects.bulk_create([ProjectContributor(project=self.project, user=self.user)])
+            self.assertIn(self.project.id, get_user_project_ids(self.user.id))
+
+    def test_production_profile_requires_a_shared_cache(self):
+        self.assertEqual(checks.check_membership_cache(None), [])
+        with override_settings(DATABASE_PROFILE="production"):
+            errors = checks.check_membership_cache(None)
+        self.assertEqual([error.id for error in errors], ["projectsmanagement.E001"])
+
+
+class AuthorizationContextTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.bob = create_user("bob")
+        self.project = create_project(self.author)
+        ProjectContributor.objects.create(project=self.project, user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_membership_is_read_once_per_request(self):
+        issue = {"description": "Desc", "project": self.project.id, "tag": "TASK", "assignee": "bob"}
+        items = [{"title": f"Issue {index}", **issue} for index in range(20)]
+
+        response = self.client.post("/api/issues/batch/", items, format="json")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        # The user's projects and the project's members, once each for the 20 items.
+        self.assertEqual(stats.as_dict()["hits"] + stats.as_dict()["misses"], 2)
+
+    def test_comment_creation_does_not_load_the_project(self):
+        issue = Issue.objects.create(title="Issue", description="Desc", project=self.project, author=self.author)
+        get_user_project_ids(self.author.id)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/comments/", {"issue": issue.id, "content": "Commentaire"})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(any('FROM "projectsmanagement_project"' in query["sql"] for query in context.captured_queries))
+
+    def test_non_member_assignee_is_refused(self):
+        carol = create_user("carol")
+        data = {"title": "Issue", "description": "Desc", "project": self.project.id, "tag": "BUG", "assignee": "carol"}
+
+        response = self.client.post("/api/issues/", data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("assignee", response.data)
+        ProjectContributor.objects.create(project=self.project, user=carol)
+        self.assertEqual(self.client.post("/api/issues/", data).status_code, 201)
+
+
+class CounterTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def create_issue(self, **fields):
+        data = {"title": "Issue", "description": "Desc", "project": self.project.id, "tag": "BUG", **fields}
+        response = self.client.post("/api/issues/", data)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data["id"]
+
+    def counts(self):
+        self.project.refresh_from_db()
+        return (self.project.todo_issue_count, self.project.in_progress_issue_count, self.project.done_issue_count)
+
+    def test_issue_counts_follow_creation_status_and_deletion(self):
+        first = self.create_issue()
+        second = self.create_issue(status="IN_PROGRESS")
+        self.assertEqual(self.counts(), (1, 1, 0))
+
+        self.client.patch(f"/api/issues/{first}/update_status/", {"status": "DONE"})
+        self.client.post("/api/issues/bulk_status/", {"ids": [second], "status": "DONE"}, format="json")
+        self.assertEqual(self.counts(), (0, 0, 2))
+
+        self.client.post("/api/issues/batch/", [{"id": first, "status": "TODO"}, self.batch_item()], format="json")
+        self.assertEqual(self.counts(), (2, 0, 1))
+
+        self.client.delete(f"/api/issues/{second}/")
+        self.assertEqual(self.counts(), (2, 0, 0))
+        self.assertEqual(counters.reconcile(fix=False), {"projects": {}, "issues": {}})
+
+        response = self.client.get("/api/projects/")
+        self.assertEqual(response.data["results"][0]["todo_issue_count"], 2)
+
+    def batch_item(self):
+        return {"title": "Batch", "description": "Desc", "project": self.project.id, "tag": "TASK"}
+
+    def test_comment_count_and_last_activity(self):
+        issue_id = self.create_issue()
+        first = self.client.post("/api/comments/", {"issue": issue_id, "content": "Premier"}).data
+        second = self.client.post("/api/comments/", {"issue": issue_id, "content": "Second"}).data
+
+        issue = Issue.objects.get(id=issue_id)
+        self.assertEqual(issue.comment_count, 2)
+        self.assertEqual(issue.last_activity_at, Comment.objects.get(id=second["id"]).created_at)
+
+        self.client.delete(f"/api/comments/{second['id']}/")
+        issue.refresh_from_db()
+        self.assertEqual(issue.comment_count, 1)
+        self.assertEqual(issue.last_activity_at, Comment.objects.get(id=first["id"]).created_at)
+
+        listed = self.client.get(f"/api/issues/?project={self.project.id}").data["results"][0]
+        self.assertEqual(listed["comment_count"], 1)
+        self.assertEqual(counters.reconcile(fix=False), {"projects": {}, "issues": {}})
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        issue_id = self.create_issue()
+        Project.objects.filter(id=self.project.id).update(todo_issue_count=5)
+        Issue.objects.filter(id=issue_id).update(comment_count=3)
+        stdout = io.StringIO()
+
+        call_command("reconcile_counters", "--dry-run", stdout=stdout)
+        self.assertIn("1 projet(s) et 1 issue(s)", stdout.getvalue())
+        self.assertEqual(self.counts(), (5, 0, 0))
+
+        call_command("reconcile_counters", stdout=io.StringIO())
+        self.assertEqual(self.counts(), (1, 0, 0))
+        self.assertEqual(Issue.objects.get(id=issue_id).comment_count, 0)
+
+
+class ProjectStatsTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.bob = create_user("bob")
+        self.project = create_project(self.author)
+        ProjectContributor.objects.create(project=self.project, user=self.bob)
+        issues = [("TODO", "HIGH", self.bob), ("TODO", "LOW", None), ("DONE", "HIGH", self.bob)]
+        for status, priority, assignee in issues:
+            Issue.objects.create(
+                title="Issue",
+                description="Desc",
+                project=self.project,
+                author=self.author,
+                status=status,
+                priority=priority,
+                assignee=assignee,
+                tag="BUG",
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def get_stats(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        grouped = [query for query in context.captured_queries if "GROUP BY" in query["sql"]]
+        return response, len(grouped)
+
+    def test_project_stats(self):
+        response, group_by_queries = self.get_stats(f"/api/projects/{self.project.id}/stats/")
+
+        self.assertEqual(group_by_queries, 1)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(response.data["status"], {"TODO": 2, "IN_PROGRESS": 0, "DONE": 1})
+        self.assertEqual(response.data["priority"], {"LOW": 1, "MEDIUM": 0, "HIGH": 2})
+        self.assertEqual(response.data["tag"], {"BUG": 3, "TASK": 0, "FEATURE": 0})
+        self.assertEqual(response.data["assignee"], [{"assignee": "bob", "count": 2}, {"assignee": None, "count": 1}])
+
+    def test_stats_are_cached_until_an_issue_changes(self):
+        url = f"/api/projects/{self.project.id}/stats/"
+        self.get_stats(url)
+        self.assertEqual(self.get_stats(url)[1], 0)
+
+        ids = list(Issue.objects.values_list("id", flat=True))
+        self.client.post("/api/issues/bulk_status/", {"ids": ids, "status": "DONE"}, format="json")
+
+        response, group_by_queries = self.get_stats(url)
+        self.assertEqual(group_by_queries, 1)
+        self.assertEqual(response.data["status"]["DONE"], 3)
+
+    def test_not_modified(self):
+        url = f"/api/projects/{self.project.id}/stats/"
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_stats_require_membership(self):
+        self.client.force_authenticate(create_user("carol"))
+
+        self.assertEqual(self.client.get(f"/api/projects/{self.project.id}/stats/").status_code, 403)
+        self.assertEqual(self.client.get("/api/projects/stats/").data["total"], 0)
+
+    def test_overall_stats_sum_the_visible_projects(self):
+        other = create_project(self.bob, "other")
+        Issue.objects.create(title="Issue", description="Desc", project=other, author=self.bob, tag="TASK")
+        create_project(create_user("carol"), "hidden")
+        self.get_stats(f"/api/projects/{self.project.id}/stats/")
+
+        self.client.force_authenticate(self.bob)
+        response, group_by_queries = self.get_stats("/api/projects/stats/")
+
+        # The first project comes from the cache, the other one is computed.
+        self.assertEqual(group_by_queries, 1)
+        self.assertEqual(response.data["projects"], 2)
+        self.assertEqual(response.data["total"], 4)
+        self.assertEqual(response.data["tag"], {"BUG": 3, "TASK": 1, "FEATURE": 0})
+
+
+class SparseFieldsetTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user("alice")
+        self.project = create_project(self.user)
+        self.issue = Issue.objects.create(
+            title="Issue", description="Longue description", project=self.project, author=self.user, tag="BUG"
+        )
+        self.comment = Comment.objects.create(issue=self.issue, author=self.user, content="Commentaire")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, " ".join(query["sql"] for query in context.captured_queries)
+
+    def test_fields_trim_the_output_and_the_columns(self):
+        response, sql = self.get("/api/issues/?fields=id,title")
+
+        self.assertEqual(response.data["results"], [{"id": self.issue.id, "title": "Issue"}])
+        self.assertNotIn('"priority"', sql)
+        self.assertNotIn("authentication_myuser", sql)
+
+    def test_exclude_defers_the_large_columns(self):
+        response, sql = self.get(f"/api/issues/{self.issue.id}/?exclude=description,assignee")
+
+        self.assertNotIn("description", response.data)
+        self.assertIn("title", response.data)
+        self.assertNotIn('"description"', sql)
+
+        response, sql = self.get(f"/api/comments/{self.comment.pk}/?fields=id")
+        self.assertEqual(response.data, {"id": str(self.comment.pk)})
+        self.assertNotIn('"content"', sql)
+
+    def test_unselected_relations_are_not_prefetched(self):
+        response, sql = self.get(f"/api/projects/{self.project.id}/?fields=id,name")
+
+        self.assertEqual(response.data, {"id": self.project.id, "name": "Projet"})
+        self.assertNotIn('FROM "projectsmanagement_issue"', sql)
+        self.assertNotIn('SELECT "projectsmanagement_projectcontributor"."id"', sql)
+
+        response, sql = self.get("/api/projects/?exclude=contributors")
+        self.assertNotIn("contributors", response.data["results"][0])
+        self.assertNotIn('SELECT "projectsmanagement_projectcontributor"."id"', sql)
+
+    def test_nested_serializers_keep_their_fields(self):
+        response, sql = self.get(f"/api/projects/{self.project.id}/?fields=issues")
+
+        self.assertEqual(list(response.data), ["issues"])
+        self.assertEqual(response.data["issues"][0]["title"], "Issue")
+        self.assertEqual(response.data["issues"][0]["author"], "alice")
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get("/api/issues/?fields=id,nope&exclude=other")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.data)
+        self.assertIn("exclude", response.data)
+
+
+class ContributorsBulkTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def add(self, usernames):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                f"/api/projects/{self.project.id}/add_contributors/", {"contributors": usernames}, format="json"
+            )
+        return response, len(context.captured_queries)
+
+    def test_add_contributors_query_count_is_constant(self):
+        small = [create_user(f"small{index}").username for index in range(3)]
+        large = [create_user(f"large{index}").username for index in range(100)]
+
+        response, small_count = self.add(small)
+        self.assertEqual(response.status_code, 200)
+        response, large_count = self.add(large)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(ProjectContributor.objects.filter(project=self.project).count(), 104)
+
+    def test_add_contributors_reports_each_username(self):
+        create_user("bob")
+
+        response, _ = self.add(["bob", "alice"])
+
+        self.assertEqual(response.data["results"], {"bob": "added", "alice": "already_contributor"})
+        self.assertEqual(response.data["added_contributors"], ["bob"])
+
+    def test_unknown_username_writes_nothing(self):
+        create_user("bob")
+
+        response, _ = self.add(["bob", "ghost"])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["results"], {"ghost": "not_found"})
+        self.assertFalse(ProjectContributor.objects.filter(user__username="bob").exists())
+
+    def test_create_project_is_transactional(self):
+        response = self.client.post(
+            "/api/projects/",
+            {"name": "New", "description": "Desc", "type": "IOS", "contributors": ["ghost"]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Project.objects.filter(name="New").exists())
+
+    def test_remove_contributors(self):
+        bob = create_user("bob")
+        create_user("carol")
+        ProjectContributor.objects.create(project=self.project, user=bob)
+
+        response = self.client.post(
+            f"/api/projects/{self.project.id}/remove_contributors/", {"contributors": ["bob", "carol"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], {"bob": "removed", "carol": "not_contributor"})
+        self.assertNotIn(self.project.id, get_user_project_ids(bob.id))
+
+
+class ProjectQueryContractTests(CacheResetTestCase):
+    """
+    Lock in the number of queries of the project endpoints, whatever the page or project size.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def populate(self, projects, contributors, issues):
+        users = [create_user(f"user{index}") for index in range(contributors)]
+        for index in range(projects):
+            project = create_project(self.author, f"project {index}")
+            for user in users:
+                ProjectContributor.objects.create(project=project, user=user)
+            for number in range(issues):
+                Issue.objects.create(
+                    title=f"Issue {number}",
+                    description="Desc",
+                    project=project,
+                    author=self.author,
+                    assignee=users[number % len(users)],
+                    tag="BUG",
+                )
+        return project
+
+    def test_project_list(self):
+        self.populate(projects=10, contributors=5, issues=0)
+        self.client.get("/api/projects/")
+
+        # count and last update, projects with their author, contributors with their user
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/projects/")
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(len(response.data["results"][0]["contributors"]), 6)
+
+    @override_settings(PROJECT_DETAIL_CACHE={"ENABLED": False})
+    def test_project_retrieve(self):
+        project = self.populate(projects=1, contributors=5, issues=20)
+        self.client.get(f"/api/projects/{project.id}/")
+
+        # project with its author, contributors with their user, issues with their author and assignee
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/projects/{project.id}/")
+        self.assertEqual(len(response.data["issues"]), 20)
+        self.assertEqual(response.data["issues"][0]["assignee"], "user0")
+
+    def test_issue_list(self):
+        self.populate(projects=1, contributors=5, issues=10)
+        self.client.get("/api/issues/")
+
+        # count and last update, issues with their author and assignee
+        with self.assertNumQueries(2):
+            self.client.get("/api/issues/")
+
+
+class PaginationTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        for number in range(25):
+            Issue.objects.create(title=f"Issue {number}", description="Desc", project=self.project, author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_limit_offset_is_the_default(self):
+        response = self.client.get("/api/issues/")
+
+        self.assertEqual(response.data["count"], 25)
+
+    def test_cursor_pagination_walks_every_issue_once(self):
+        seen = []
+        url = "/api/issues/?pagination=cursor"
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertNotIn("count", response.data)
+            seen += [issue["id"] for issue in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(set(seen), set(Issue.objects.values_list("id", flat=True)))
+
+    def test_cursor_pages_read_the_index_in_order(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite specific.")
+        issue = Issue.objects.first()
+        for number in range(5):
+            Comment.objects.create(issue=issue, author=self.author, content=f"Commentaire {number}")
+
+        for url in (
+            f"/api/issues/?pagination=cursor&limit=10&project={self.project.id}",
+            f"/api/comments/?pagination=cursor&limit=2&issue={issue.id}",
+        ):
+            first_page = self.client.get(url)
+            for page_url in (url, first_page.data["next"]):
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(page_url)
+                plan = query_plan(context.captured_queries[-1]["sql"])
+                # No sort of the whole list: the page is a range of the cursor index.
+                self.assertFalse([line for line in plan if "TEMP B-TREE" in line], plan)
+
+
+class QueryPlanTests(CacheResetTestCase):
+    """
+    Fail if a query of a hot endpoint regresses to a full table scan. The SQL is captured from the
+    requests, so the filters, ordering and pagination of the viewsets are part of the plans.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user("alice")
+        self.project = create_project(self.user)
+        self.issue = Issue.objects.create(title="Issue", description="d", project=self.project, author=self.user)
+        Comment.objects.create(issue=self.issue, author=self.user, content="Comment")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertNoFullScan(self, *urls):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite specific.")
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            for query in queries.captured_queries:
+                if not query["sql"].startswith("SELECT"):
+                    continue
+                plan = query_plan(query["sql"])
+                full_scans = [line for line in plan if line.startswith("SCAN ") and "USING" not in line]
+                self.assertEqual(full_scans, [], f"{url}\n{query['sql']}\n" + "\n".join(plan))
+
+    def test_project_queries_use_indexes(self):
+        self.assertNoFullScan(
+            "/api/projects/", "/api/projects/?pagination=cursor", f"/api/projects/{self.project.id}/"
+        )
+
+    def test_issue_list_queries_use_indexes(self):
+        self.assertNoFullScan(
+            "/api/issues/",
+            f"/api/issues/?project={self.project.id}&status=TODO&priority=HIGH",
+            "/api/issues/?assignee=alice&status=IN_PROGRESS",
+            f"/api/issues/?project={self.project.id}&ordering=-updated_at",
+            f"/api/issues/?project={self.project.id}&pagination=cursor",
+        )
+
+    def test_comment_list_queries_use_indexes(self):
+        self.assertNoFullScan(
+            "/api/comments/", f"/api/comments/?issue={self.issue.id}", "/api/comments/?pagination=cursor"
+        )
+
+
+class IssueFilterTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.bob = create_user("bob")
+        self.project = create_project(self.author)
+        ProjectContributor.objects.create(project=self.project, user=self.bob)
+        self.other_project = create_project(self.author, "other")
+        for status_value in ["TODO", "IN_PROGRESS", "DONE"]:
+            for priority in ["LOW", "HIGH"]:
+                Issue.objects.create(
+                    title=f"{status_value} {priority}",
+                    description="Desc",
+                    project=self.project,
+                    author=self.author,
+                    assignee=self.bob if priority == "HIGH" else None,
+                    status=status_value,
+                    priority=priority,
+                    tag="BUG",
+                )
+        Issue.objects.create(title="Other", description="Desc", project=self.other_project, author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def titles(self, query):
+        response = self.client.get(f"/api/issues/?{query}")
+        self.assertEqual(response.status_code, 200, response.data)
+        return {issue["title"] for issue in response.data["results"]}
+
+    def test_filters(self):
+        self.assertEqual(self.titles(f"project={self.project.id}&status=TODO"), {"TODO LOW", "TODO HIGH"})
+        self.assertEqual(self.titles("status=TODO,DONE&priority=HIGH"), {"TODO HIGH", "DONE HIGH"})
+        self.assertEqual(self.titles("assignee=bob&status=IN_PROGRESS"), {"IN_PROGRESS HIGH"})
+        self.assertEqual(self.titles(f"project={self.other_project.id}"), {"Other"})
+
+    def test_invalid_values_are_rejected(self):
+        response = self.client.get("/api/issues/?status=CLOSED&project=abc")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"status", "project"})
+
+    def test_ordering(self):
+        response = self.client.get("/api/issues/?ordering=-title&limit=2")
+
+        self.assertEqual([issue["title"] for issue in response.data["results"]], ["TODO LOW", "TODO HIGH"])
+
+
+class SearchTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        if not search.is_available():
+            self.skipTest("Full-text search requires SQLite FTS5.")
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        self.hidden_project = create_project(create_user("bob"), "hidden")
+        self.issue = Issue.objects.create(
+            title="Crash au démarrage", description="L'application plante", project=self.project, author=self.author
+        )
+        Issue.objects.create(
+            title="Crash caché", description="Invisible", project=self.hidden_project, author=self.author
+        )
+        self.comment = Comment.objects.create(issue=self.issue, author=self.author, content="Le crash vient du cache")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def search_schema(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT type, name, sql FROM sqlite_master WHERE name GLOB 'projectsmanagement_*_search*' ORDER BY name"
+            )
+            return cursor.fetchall()
+
+    def results(self, query):
+        response = self.client.get("/api/search/", {"q": query})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data["results"]
+
+    def test_search_respects_visibility(self):
+        results = self.results("crash")
+
+        self.assertEqual(
+            {(result["type"], result["id"]) for result in results},
+            {("issue", self.issue.id), ("comment", str(self.comment.id))},
+        )
+        self.assertIn("<mark>", results[0]["snippet"])
+
+    def test_index_follows_updates_and_deletions(self):
+        self.issue.title = "Lenteur"
+        self.issue.save()
+        self.assertEqual([result["type"] for result in self.results("demarrage")], [])
+        self.assertEqual([result["id"] for result in self.results("lenteur")], [self.issue.id])
+
+        self.issue.delete()
+        self.assertEqual(self.results("crash"), [])
+
+    def test_installed_schema_matches_the_migration(self):
+        migrated = self.search_schema()
+        with connection.cursor() as cursor:
+            for kind, name, _ in migrated:
+                if kind == "trigger" or name in search.SEARCH_TABLES:
+                    cursor.execute(f"DROP {kind.upper()} {name}")
+
+        search.install_search_index(connection)
+
+        self.assertEqual(self.search_schema(), migrated)
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.results('crash" OR "cache'), [])
+        self.assertEqual(self.client.get("/api/search/").status_code, 400)
+
+    def test_limit_must_be_positive(self):
+        for limit in ("-1", "0", "abc"):
+            self.assertEqual(self.client.get("/api/search/", {"q": "crash", "limit": limit}).status_code, 400)
+
+    def test_snippets_are_escaped(self):
+        Comment.objects.create(issue=self.issue, author=self.author, content="<script>alert('crash')</script>")
+
+        snippets = [result["snippet"] for result in self.results("alert")]
+
+        self.assertEqual(snippets, ["&lt;script&gt;<mark>alert</mark>(&#x27;crash&#x27;)&lt;/script&gt;"])
+
+    def test_scores_are_normalised_per_index(self):
+        Issue.objects.create(
+            title="Lenteur",
+            description="Un crash parmi beaucoup d'autres mots " * 5,
+            project=self.project,
+            author=self.author,
+        )
+
+        scores = [(result["type"], result["score"]) for result in self.results("crash")]
+
+        # The best match of each index scores 1, whatever the scale of its bm25 ranks.
+        self.assertEqual(scores[:2], [("issue", 1.0), ("comment", 1.0)])
+        self.assertEqual(scores[2][0], "issue")
+        self.assertLess(scores[2][1], 1.0)
+
+
+class IssueBatchTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.bob = create_user("bob")
+        self.project = create_project(self.author)
+        ProjectContributor.objects.create(project=self.project, user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def post(self, items):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/issues/batch/", items, format="json")
+        return response, len(context.captured_queries)
+
+    def new_issues(self, count):
+        issue = {"description": "Desc", "project": self.project.id, "tag": "TASK", "assignee": "bob"}
+        return [{"title": f"Issue {index}", **issue} for index in range(count)]
+
+    def test_create_and_update(self):
+        issue = Issue.objects.create(title="Old", description="Desc", project=self.project, author=self.author)
+
+        response, _ = self.post(self.new_issues(2) + [{"id": issue.id, "status": "DONE", "assignee": "bob"}])
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["created", "created", "updated"])
+        self.assertEqual(response.data["results"][0]["issue"]["assignee"], "bob")
+        issue.refresh_from_db()
+        self.assertEqual((issue.status, issue.assignee), ("DONE", self.bob))
+        self.assertEqual(Issue.objects.filter(author=self.author, assignee=self.bob).count(), 3)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        # Both batches with warm caches, and in one bulk insert (SQLite splits them past 999 parameters).
+        self.post(self.new_issues(1))
+        _, small = self.post(self.new_issues(2))
+        _, large = self.post(self.new_issues(50))
+
+        self.assertEqual(small, large)
+
+    def test_invalid_item_writes_nothing(self):
+        carol = create_user("carol")
+        items = self.new_issues(2)
+        items[1]["assignee"] = carol.username
+
+        response, _ = self.post(items)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["valid", "error"])
+        self.assertIn("assignee", response.data["results"][1]["errors"])
+        self.assertFalse(Issue.objects.exists())
+
+    def test_invalid_ids_are_item_errors(self):
+        response, _ = self.post([{"id": [1], "status": "DONE"}, {"id": {"pk": 1}}, {"id": True}])
+
+        self.assertEqual(response.status_code, 400)
+        errors = [result["errors"] for result in response.data["results"]]
+        self.assertEqual(errors, [{"id": "Id d'issue invalide."}] * 3)
+
+
+class BulkStatusTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.bob = create_user("bob")
+        self.project = create_project(self.author)
+        ProjectContributor.objects.create(project=self.project, user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def create_issue(self, **kwargs):
+        return Issue.objects.create(title="Issue", description="Desc", project=self.project, **kwargs)
+
+    def test_only_assignee_or_author_issues_change(self):
+        assigned = self.create_issue(author=self.author, assignee=self.bob)
+        authored = self.create_issue(author=self.bob)
+        done = self.create_issue(author=self.bob, status="DONE")
+        refused = self.create_issue(author=self.author)
+        hidden = Issue.objects.create(
+            title="Hidden", description="Desc", project=create_project(self.author, "hidden"), author=self.bob
+        )
+
+        # select, update issues, touch project, update its issue counters, inside a savepoint
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                "/api/issues/bulk_status/",
+                {"ids": [assigned.id, authored.id, done.id, refused.id, hidden.id, 999], "status": "DONE"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["updated"], [assigned.id, authored.id])
+        self.assertEqual(response.data["unchanged"], [done.id])
+        self.assertEqual(response.data["refused"], sorted([refused.id, hidden.id, 999]))
+        self.assertEqual(Issue.objects.filter(status="DONE").count(), 3)
+
+    def test_invalid_status(self):
+        response = self.client.post("/api/issues/bulk_status/", {"ids": [1], "status": "CLOSED"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        self.issue = Issue.objects.create(title="Issue", description="Desc", project=self.project, author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def assertNotModified(self, url, response, queries):
+        with self.assertNumQueries(queries):
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(second.status_code, 304)
+
+    def test_project_retrieve(self):
+        url = f"/api/projects/{self.project.id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+
+        self.assertNotModified(url, response, queries=1)
+
+        ProjectContributor.objects.create(project=self.project, user=create_user("bob"))
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn("bob", changed.data["contributors"])
+
+    def test_project_retrieve_follows_issue_changes(self):
+        url = f"/api/projects/{self.project.id}/"
+        response = self.client.get(url)
+
+        self.issue.title = "Renamed"
+        self.issue.save()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_issue_list(self):
+        response = self.client.get("/api/issues/")
+
+        self.assertNotModified("/api/issues/", response, queries=1)
+
+        Issue.objects.create(title="Other", description="Desc", project=self.project, author=self.author)
+        self.issue.delete()
+        self.assertEqual(self.client.get("/api/issues/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_comment_retrieve(self):
+        comment = Comment.objects.create(issue=self.issue, author=self.author, content="Content")
+        url = f"/api/comments/{comment.id}/"
+        response = self.client.get(url)
+
+        self.assertNotModified(url, response, queries=1)
+
+
+class ProjectDetailCacheTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        self.issue = Issue.objects.create(title="Issue", description="Desc", project=self.project, author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f"/api/projects/{self.project.id}/"
+
+    def test_detail_is_served_from_cache(self):
+        first = self.client.get(self.url)
+
+        # the project itself, for permissions and its version
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(responsecache.stats.as_dict()["hits"], 1)
+        self.assertGreater(responsecache.stats.as_dict()["bytes_saved"], 0)
+        self.assertEqual(responsecache.stats.as_dict(), cachestats.snapshot()["project-detail"])
+
+    def test_changes_bump_the_version(self):
+        self.client.get(self.url)
+
+        self.issue.title = "Renamed"
+        self.issue.save()
+        self.assertEqual(self.client.get(self.url).data["issues"][0]["title"], "Renamed")
+
+        ProjectContributor.objects.create(project=self.project, user=create_user("bob"))
+        self.assertIn("bob", self.client.get(self.url).data["contributors"])
+
+        self.project.name = "Renamed"
+        self.project.save()
+        self.assertEqual(self.client.get(self.url).data["name"], "Renamed")
+
+        self.assertEqual(responsecache.stats.as_dict()["hits"], 0)
+
+
+class ExportTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        self.project = create_project(self.author)
+        self.issue = Issue.objects.create(
+            title="Issue", description="Ligne 1\nLigne 2", project=self.project, author=self.author, tag="BUG"
+        )
+        self.comment = Comment.objects.create(issue=self.issue, author=self.author, content="Commentaire")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def export(self, output):
+        response = self.client.get(f"/api/projects/{self.project.id}/export/", {"output": output})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self.export("ndjson").splitlines()]
+
+        self.assertEqual([row["type"] for row in rows], ["issue", "comment"])
+        self.assertEqual(rows[0]["description"], "Ligne 1\nLigne 2")
+        self.assertEqual(rows[1]["id"], str(self.comment.id))
+        self.assertEqual(rows[1]["author"], "alice")
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("csv"))))
+
+        self.assertEqual([row["type"] for row in rows], ["issue", "comment"])
+        self.assertEqual(rows[0]["tag"], "BUG")
+        self.assertEqual(rows[1]["issue"], str(self.issue.id))
+
+    def test_only_contributors_can_export(self):
+        self.client.force_authenticate(create_user("bob"))
+
+        response = self.client.get(f"/api/projects/{self.project.id}/export/")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ImportTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = create_user("alice")
+        create_user("bob")
+        self.project = create_project(self.author)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, records):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.writelines(json.dumps(record) + "\n" for record in records)
+        return path
+
+    def issue(self, issue_id, tag, author, **fields):
+        issue = {"type": "issue", "id": issue_id, "project": self.project.id, "title": "Issue", "tag": tag}
+        return {**issue, "author": author, **fields}
+
+    def records(self):
+        return [
+            self.issue(500, "BUG", "alice", assignee="bob", created_at="2020-01-02T03:04:05+00:00"),
+            self.issue(501, "NOPE", "alice"),
+            {"type": "comment", "issue": 500, "author": "bob", "content": "Hello"},
+            {"type": "comment", "issue": 501, "author": "bob", "content": "Orphan"},
+            self.issue(502, "TASK", "ghost"),
+            self.issue(503, "TASK", "bob"),
+        ]
+
+    def test_import(self):
+        path = self.write("dump.ndjson", self.records())
+        stderr = io.StringIO()
+
+        call_command("import_issues", path, batch_size=2, stdout=io.StringIO(), stderr=stderr)
+
+        issue = Issue.objects.get(id=500)
+        self.assertEqual((issue.assignee.username, issue.created_at.year), ("bob", 2020))
+        self.assertEqual(Comment.objects.get().issue, issue)
+        # The import leaves auto_now(_add) alone for the other writes of the process.
+        issue.save()
+        self.assertGreater(issue.updated_at.year, 2020)
+        self.assertEqual(set(Issue.objects.values_list("id", flat=True)), {500, 503})
+        self.assertEqual(stderr.getvalue().count("ignoré"), 3)
+
+    def test_counters_follow_the_batches(self):
+        issue = Issue.objects.create(title="Existing", description="d", project=self.project, author=self.author)
+        Comment.objects.create(issue=issue, author=self.author, content="Recent")
+        old_comment = {"type": "comment", "issue": issue.id, "author": "bob", "created_at": "2020-01-01T00:00:00+00:00"}
+        path = self.write("dump.ndjson", [old_comment, *self.records()])
+        before = self.project.version
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("import_issues", path, batch_size=2, stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertEqual(counters.reconcile(fix=False), {"projects": {}, "issues": {}})
+        self.assertEqual(Issue.objects.get(id=issue.id).comment_count, 2)
+        self.assertNotIn("GROUP BY", " ".join(query["sql"] for query in queries.captured_queries))
+        self.project.refresh_from_db()
+        self.assertNotEqual(self.project.version, before)
+
+    def test_malformed_lines_and_taken_ids_are_rejected(self):
+        Issue.objects.create(id=500, title="Existing", description="d", project=self.project, author=self.author)
+        path = self.write("dump.ndjson", [self.issue(503, "TASK", "bob"), self.issue(504, "TASK", "bob")])
+        with open(path, "a") as file:
+            file.write('{"type": "issue", "id": \n[1, 2]\n')
+            for record in (self.issue(500, "BUG", "bob"), self.issue(503, "BUG", "bob")):
+                file.write(json.dumps(record) + "\n")
+        stderr = io.StringIO()
+
+        call_command("import_issues", path, batch_size=10, stdout=io.StringIO(), stderr=stderr)
+
+        self.assertEqual(set(Issue.objects.values_list("id", flat=True)), {500, 503, 504})
+        self.assertEqual(Issue.objects.get(id=500).title, "Existing")
+        self.assertIn("Enregistrement 3 ignoré : JSON invalide", stderr.getvalue())
+        self.assertIn("Enregistrement 4 ignoré : objet JSON attendu", stderr.getvalue())
+        self.assertIn("Enregistrement 5 ignoré : id déjà utilisé : 500.", stderr.getvalue())
+        self.assertIn("Enregistrement 6 ignoré : id déjà utilisé : 503.", stderr.getvalue())
+
+    def test_resume_from_checkpoint(self):
+        path = self.write("dump.ndjson", self.records())
+        with open(f"{path}.checkpoint", "w") as checkpoint:
+            checkpoint.write("4")
+
+        call_command("import_issues", path, stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertEqual(list(Issue.objects.values_list("id", flat=True)), [503])
+        with open(f"{path}.checkpoint") as checkpoint:
+            self.assertEqual(checkpoint.read(), "6")
+
+
+class BenchmarkTests(CacheResetTestCase):
+
+    def test_seed_and_benchmark_every_route(self):
+        call_command(
+            "seed_data", users=5, projects=2, contributors=2, issues=3, comments=2, password="pw", stdout=io.StringIO()
+        )
+        self.assertEqual((Project.objects.count(), Issue.objects.count(), Comment.objects.count()), (2, 6, 12))
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "report.json")
+        call_command("benchmark_api", password="pw", iterations=2, warmup=0, output=output, stdout=io.StringIO())
+
+        with open(output) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(report["uncovered_routes"], [])
+        failed = {name: result["status"] for name, result in report["endpoints"].items() if result["status"] >= 400}
+        self.assertEqual(failed, {})
+        self.assertGreater(report["caches"]["membership"]["hits"], 0)
+        # Write scenarios are rolled back, the dataset is unchanged.
+        self.assertEqual((Project.objects.count(), Issue.objects.count(), Comment.objects.count()), (2, 6, 12))
+
+    def test_filtering_client_side_and_server_side_agree(self):
+        call_command(
+            "seed_data", users=5, projects=2, contributors=2, issues=30, comments=1, password="pw", stdout=io.StringIO()
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "filtering.json")
+
+        call_command("benchmark_filtering", priority="LOW", output=output, stdout=io.StringIO())
+
+        with open(output) as report_file:
+            report = json.load(report_file)
+        expected = Issue.objects.filter(assignee__username="bench_user_0", priority="LOW").count()
+        self.assertEqual(report["server_side"]["matches"], expected)
+        self.assertEqual(report["client_side"]["requests"], 1)
+        self.assertLess(report["server_side"]["bytes"], report["client_side"]["bytes"])
+
+    def test_create_issue_without_assignee(self):
+        user = create_user("alice")
+        project = create_project(user)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.post(
+            "/api/issues/", {"title": "t", "description": "d", "project": project.id, "tag": "BUG"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+
+class QueryInstrumentationTests(QueryBudgetTestMixin, CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user("alice")
+        self.project = create_project(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(SQL_INSTRUMENTATION={"SERVER_TIMING": True})
+    def test_server_timing_header(self):
+        response = self.client.get(f"/api/projects/{self.project.id}/")
+
+        self.assertEqual(response.view_name, "ProjectViewSet.retrieve")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries, 0 duplicates", total;dur=')
+
+    @override_settings(SQL_INSTRUMENTATION={"BUDGETS": {"ProjectViewSet.list": {"queries": 1}}})
+    def test_request_over_budget_is_logged(self):
+        with self.assertLogs("softdesk.sql", "WARNING") as logs:
+            response = self.client.get("/api/projects/")
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn("ProjectViewSet.list", logs.output[0])
+        with self.assertRaises(AssertionError):
+            self.assertWithinBudget(response)
+
+    @override_settings(SQL_INSTRUMENTATION={"CACHE_STATS_EVERY": 1})
+    def test_cache_stats_are_logged(self):
+        with self.assertLogs("softdesk.cache", "INFO") as logs:
+            self.client.get("/api/projects/")
+
+        self.assertRegex(logs.output[0], r"membership \d+ hits / \d+ misses")
+        self.assertIn("users", logs.output[0])
+        self.assertRegex(logs.output[0], r"project-detail \d+ hits / \d+ misses \(\d+%\), \d+ bytes saved")
+
+    def test_every_action_within_budget(self):
+        call_command(
+            "seed_data", users=5, projects=2, contributors=2, issues=3, comments=2, password="pw", stdout=io.StringIO()
+        )
+        benchmark = Benchmark(get_user_model().objects.get(username="bench_user_0"), "pw")
+        for scenario in SCENARIOS:
+            with self.subTest(scenario.name):
+                # The budgets are for warm membership caches.
+                benchmark.run_once(scenario)
+                self.assertWithinBudget(benchmark.run_once(scenario))
+
+
+class ProfilingTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.settings = {"ENABLED": True, "DIRECTORY": self.directory, "SAMPLE_RATE": 1}
+        self.staff = create_user("alice")
+        self.staff.is_staff = True
+        self.staff.save()
+        self.project = create_project(self.staff)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {VersionedRefreshToken.for_user(user).access_token}")
+        return client
+
+    def test_staff_request_is_profiled(self):
+        with override_settings(PROFILING=self.settings):
+            response = self.client_for(self.staff).get("/api/projects/?profile=1")
+            stdout = io.StringIO()
+            call_command("profiles", "latest", limit=5, stdout=stdout)
+
+        self.assertEqual(os.listdir(self.directory), [response["X-Profile-Id"]])
+        self.assertTrue(response["X-Profile-Id"].startswith("ProjectViewSet.list-"))
+        self.assertEqual(len(stdout.getvalue().splitlines()), 7)
+
+    def test_not_profiled_without_flag_staff_or_sample(self):
+        user = create_user("bob")
+        create_project(user)
+
+        with override_settings(PROFILING=self.settings):
+            self.client_for(self.staff).get("/api/projects/")
+            self.client_for(user).get("/api/projects/", HTTP_X_PROFILE="1")
+        with override_settings(PROFILING={**self.settings, "SAMPLE_RATE": 0}):
+            self.client_for(self.staff).get("/api/projects/", HTTP_X_PROFILE="1")
+        with override_settings(PROFILING={"DIRECTORY": self.directory}):
+            self.client_for(self.staff).get("/api/projects/", HTTP_X_PROFILE="1")
+
+        self.assertEqual(os.listdir(self.directory), [])
+
+    async def test_overlapping_requests_are_profiled_one_at_a_time(self):
+        client = AsyncClient()
+        headers = {"Authorization": f"Bearer {VersionedRefreshToken.for_user(self.staff).access_token}"}
+
+        # Both requests share the test's database connection, so their query counts would mix.
+        with override_settings(PROFILING=self.settings, SQL_INSTRUMENTATION={"ENABLED": False}):
+            responses = await asyncio.gather(
+                *(client.get("/api/projects/?profile=1", headers=headers) for _ in range(2))
+            )
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(len([response for response in responses if "X-Profile-Id" in response]), 1)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertFalse(profiling.profiler_lock.locked())
+
+
+@override_settings(ROOT_URLCONF="softdesk.asgi_urls")
+class AsyncReadTests(CacheResetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user("alice")
+        self.project = create_project(self.user)
+        self.issue = Issue.objects.create(
+            title="t", description="d", project=self.project, author=self.user, assignee=self.user, tag="BUG"
+        )
+        self.comment = Comment.objects.create(issue=self.issue, author=self.user, content="c")
+        self.headers = {"Authorization": f"Bearer {VersionedRefreshToken.for_user(self.user).access_token}"}
+        self.sync_client = APIClient(headers=self.headers)
+
+    async def test_same_responses_as_sync_views(self):
+        client = AsyncClient()
+        for url in [
+            "/api/projects/",
+            f"/api/projects/{self.project.id}/",
+            "/api/issues/?status=TODO&limit=5",
+            f"/api/issues/{self.issue.id}/",
+            "/api/comments/",
+            f"/api/comments/{self.comment.id}/",
+        ]:
+            with self.subTest(url):
+                with override_settings(ROOT_URLCONF="softdesk.urls"):
+                    # The first request fills the membership and response caches.
+                    await sync_to_async(self.sync_client.get)(url)
+                    expected = await sync_to_async(self.sync_client.get)(url)
+                response = await client.get(url, headers=self.headers)
+
+                self.assertTrue(iscoroutinefunction(resolve(url.split("?")[0]).func))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+                self.assertEqual(response.query_metrics.queries, expected.query_metrics.queries)
+                self.assertEqual(response["ETag"], expected["ETag"])
+                not_modified = await client.get(url, headers={**self.headers, "If-None-Match": response["ETag"]})
+                self.assertEqual(not_modified.status_code, 304)
+
+    async def test_errors_and_writes(self):
+        client = AsyncClient()
+        other = await sync_to_async(create_user)("bob")
+        hidden = await sync_to_async(create_project)(other)
+
+        self.assertEqual((await client.get("/api/issues/")).status_code, 401)
+        self.assertEqual((await client.get("/api/issues/999/", headers=self.headers)).status_code, 404)
+        self.assertEqual((await client.get("/api/comments/nope/", headers=self.headers)).status_code, 404)
+        self.assertEqual((await client.get(f"/api/projects/{hidden.id}/", headers=self.headers)).status_code, 403)
+        response = await client.post(
+            "/api/comments/",
+            {"issue": self.issue.id, "content": "c"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+
+
+# VACUUM can't run in the transaction of a TestCase.
+class SQLiteProfileTests(CacheResetMixin, TransactionTestCase):
+
+    def test_pragmas_set_on_new_connections(self):
+        cache_size = sqlite.pragma(connection, "cache_size")
+        try:
+            with override_settings(SQLITE_PRAGMAS={"cache_size": -1234}):
+                with CaptureQueriesContext(connection) as queries:
+                    sqlite.configure_connection(sender=None, connection=connection)
+            self.assertEqual(sqlite.pragma(connection, "cache_size"), -1234)
+            self.assertEqual(len(queries), 0)
+        finally:
+            connection.connection.execute(f"PRAGMA cache_size = {cache_size}")
+
+    def test_asgi_profile_closes_connections(self):
+        # In a new interpreter: the settings read the profile at import time.
+        result = subprocess.run(
+            [sys.executable, "-c", "from softdesk import settings_asgi; print(settings_asgi.DATABASES['default'])"],
+            env={**os.environ, "SOFTDESK_DB_PROFILE": "production"},
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertIn("'CONN_MAX_AGE': 0", result.stdout)
+
+    def test_maintenance(self):
+        author = create_user("alice")
+        issue = Issue.objects.create(title="t", description="d", project=create_project(author), author=author)
+        # Deleted rows leave gaps in the implicit rowids the comment search index is keyed on.
+        for number in range(20):
+            Comment.objects.create(issue=issue, author=author, content=f"Bruit {number}")
+        Comment.objects.filter(content__startswith="Bruit").delete()
+        comment = Comment.objects.create(issue=issue, author=author, content="Fuite mémoire")
+        client = APIClient()
+        client.force_authenticate(author)
+        stdout = io.StringIO()
+
+        call_command("sqlite_maintenance", stdout=stdout)
+        call_command("sqlite_maintenance", vacuum=True, stdout=stdout)
+
+        self.assertIn("ANALYZE", stdout.getvalue())
+        self.assertIn("VACUUM complet", stdout.getvalue())
+        self.assertIn("Maintenance terminée", stdout.getvalue())
+        if not search.is_available():
+            return
+        self.assertIn("Index de recherche reconstruits", stdout.getvalue())
+
+        results = client.get("/api/search/", {"q": "fuite"}).data["results"]
+        self.assertEqual([(result["type"], result["id"]) for result in results], [("comment", str(comment.id))])
@@ -1,34 +1,102 @@
-from .models import Project, ProjectContributor
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from authentication.usercache import get_users_by_username
+from softdesk.fieldsets import load_only
+from .membership import invalidate
+from .models import Issue, Project, ProjectContributor
+from .serializers import IssueListSerializer
+from .versioning import batched_project_touches, touch_projects
 
 
-def check_contributors(project):
+def get_viewable_projects(user):
     """
-    Return list of contributors to the project.
+    Return a queryset of the projects the given user can view/access.
+
+    Visibility is expressed as a single "author OR contributor" condition so the
+    result can be composed as a subquery (``project__in=get_viewable_projects(user)``)
+    instead of being materialized in Python.
     """
-    author = project.author
-    contributors = ProjectContributor.objects.filter(project=project)
-    contributors_list = []
-    for contributor in contributors:
-        contributors_list.append(contributor.user)
-    if author not in contributors_list:
-        contributors_list.append(author)
+    contributions = ProjectContributor.objects.filter(user=user).values("project_id")
+    return Project.objects.filter(Q(author=user) | Q(id__in=contributions))
 
-    return contributors_list
 
+def contributors_prefetch():
+    """
+    Prefetch the contributors of projects along with their user, for username serialization.
+    """
+    return Prefetch("contributors", queryset=ProjectContributor.objects.select_related("user"))
 
-def get_viewable_projects(user):
+
+def issues_prefetch():
+    """
+    Prefetch the issues of projects along with their author and assignee, without the columns
+    the nested IssueListSerializer doesn't read (the description above all).
+    """
+    issues = Issue.objects.select_related("author", "assignee")
+    return Prefetch("issues", queryset=load_only(issues, IssueListSerializer(), always=("project",)))
+
+
+ADDED = "added"
+REMOVED = "removed"
+ALREADY_CONTRIBUTOR = "already_contributor"
+NOT_CONTRIBUTOR = "not_contributor"
+NOT_FOUND = "not_found"
+
+
+def resolve_usernames(usernames):
+    """
+    Return a {username: user id} dict for the existing usernames, from the user cache and at most one query.
     """
-    Return list of projects the given user can view/access.
+    return {username: user.id for username, user in get_users_by_username(usernames).items()}
+
+
+def add_contributors(project, usernames, include_author=False):
+    """
+    Add the given usernames as contributors of the project with a constant number of queries.
+
+    Return a {username: status} report. Nothing is written if one of the usernames does not exist.
+    """
+    usernames = list(dict.fromkeys(usernames))
+    user_ids = resolve_usernames(usernames)
+    report = {username: NOT_FOUND for username in usernames if username not in user_ids}
+    if report:
+        return report
+
+    wanted_ids = set(user_ids.values())
+    if include_author:
+        wanted_ids.add(project.author_id)
+
+    with transaction.atomic():
+        existing_ids = set(
+            ProjectContributor.objects.filter(project=project, user_id__in=wanted_ids).values_list("user_id", flat=True)
+        )
+        new_ids = wanted_ids - existing_ids
+        ProjectContributor.objects.bulk_create(
+            [ProjectContributor(project=project, user_id=user_id) for user_id in new_ids], ignore_conflicts=True
+        )
+
+    # bulk_create does not send post_save, so the membership cache and the project version are updated here.
+    invalidate(user_ids=new_ids, project_ids=[project.id])
+    if new_ids:
+        touch_projects([project.id])
+    return {username: ADDED if user_ids[username] in new_ids else ALREADY_CONTRIBUTOR for username in usernames}
+
+
+def remove_contributors(project, usernames):
+    """
+    Remove the given usernames from the contributors of the project with a constant number of queries.
+
+    Return a {username: status} report. Nothing is written if one of the usernames does not exist.
     """
-    projects_list = []
-    contributions = ProjectContributor.objects.filter(user=user)
-    own_projects = Project.objects.filter(author=user)
-    for project in own_projects:
-        projects_list.append(project)
+    usernames = list(dict.fromkeys(usernames))
+    user_ids = resolve_usernames(usernames)
+    report = {username: NOT_FOUND for username in usernames if username not in user_ids}
+    if report:
+        return report
 
-    for contribution in contributions:
-        project = contribution.project
-        if project not in projects_list:
-            projects_list.append(project)
+    with batched_project_touches(), transaction.atomic():
+        contributions = ProjectContributor.objects.filter(project=project, user_id__in=user_ids.values())
+        removed_ids = set(contributions.values_list("user_id", flat=True))
+        contributions.delete()
 
-    return projects_list
+    return {username: REMOVED if user_ids[username] in removed_ids else NOT_CONTRIBUTOR for username in usernames}
@@ -0,0 +1,40 @@
+import threading
+from contextlib import contextmanager
+from django.db.models import F
+from django.utils import timezone
+from .models import Project
+
+
+_state = threading.local()
+
+
+def touch_projects(project_ids):
+    """
+    Bump the version and updated_at of the given projects, to invalidate their ETags and cached responses.
+    Inside batched_project_touches() the ids are collected and bumped once, when the block exits.
+    """
+    project_ids = {project_id for project_id in project_ids if project_id is not None}
+    if not project_ids:
+        return
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending.update(project_ids)
+        return
+    Project.objects.filter(id__in=project_ids).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+@contextmanager
+def batched_project_touches():
+    """
+    Collect the project touches made inside the block (by signals on many rows for instance)
+    and apply them with a single UPDATE on exit.
+    """
+    if getattr(_state, "pending", None) is not None:
+        yield
+        return
+    pending = _state.pending = set()
+    try:
+        yield
+    finally:
+        _state.pending = None
+    touch_projects(pending)
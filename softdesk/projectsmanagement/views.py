@@ -1,10 +1,16 @@
-from rest_framework.viewsets import ModelViewSet
+from collections import Counter
+from rest_framework.viewsets import ModelViewSet, ViewSet
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.decorators import action
-from django.contrib.auth import get_user_model
-from .models import Project, Issue, Comment, ProjectContributor
+from rest_framework.filters import OrderingFilter
+from authentication.usercache import get_users_by_username
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .models import Project, Issue, Comment
 from .serializers import (
     ProjectSerializer,
     ProjectListSerializer,
@@ -13,8 +19,29 @@ from .serializers import (
     CommentListSerializer,
     CommentSerializer,
 )
+from .asyncviews import AsyncReadMixin
+from .authorization import get_authorization
+from .conditional import ConditionalGetMixin
+from softdesk.fieldsets import SparseFieldsetMixin
+from .filters import QueryParameterFilter
+from . import counters, export, projectstats, responsecache, search
+from .pagination import LimitOffsetOrCursorPagination
+from .versioning import touch_projects
 from .permissions import IsProjectContributor, IsAuthorOrReadOnly
-from .utils import get_viewable_projects, check_contributors
+from .utils import (
+    ADDED,
+    NOT_FOUND,
+    REMOVED,
+    add_contributors,
+    contributors_prefetch,
+    get_viewable_projects,
+    issues_prefetch,
+    remove_contributors,
+)
+
+
+def is_issue_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
 
 
 class MultipleSerializerMixin:
@@ -28,10 +55,56 @@ class MultipleSerializerMixin:
         return super().get_serializer_class()
 
 
-class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
+class ProjectViewSet(AsyncReadMixin, ConditionalGetMixin, SparseFieldsetMixin, MultipleSerializerMixin, ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectListSerializer
     detail_serializer_class = ProjectSerializer
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ("-created_at", "-id")
+    # Read by the validators of ConditionalGetMixin.
+    always_loaded_fields = ("version", "updated_at")
+
+    def get_queryset(self):
+        """
+        List only the projects the user can view; detail actions keep the full queryset
+        so access is decided by the permission classes.
+        """
+        if self.action == "list":
+            queryset = get_viewable_projects(self.request.user).select_related("author").prefetch_related(
+                contributors_prefetch()
+            )
+        else:
+            queryset = super().get_queryset().select_related("author")
+        return self.sparse_queryset(queryset)
+
+    def get_object_version(self, instance):
+        return f"{instance.version}-{instance.updated_at.isoformat()}"
+
+    def prefetch_instance(self, instance):
+        lookups = {"contributors": contributors_prefetch, "issues": issues_prefetch}
+        prefetch_related_objects([instance], *(lookup() for field, lookup in lookups.items() if self.wants(field)))
+
+    def get_retrieve_data(self, instance):
+        """
+        Serve the project detail from the response cache, keyed by the project version.
+        """
+        serialize = super().get_retrieve_data
+        key = responsecache.make_key(
+            instance.pk, self.get_object_version(instance), self.request.query_params.urlencode()
+        )
+        return responsecache.get_or_serialize(key, lambda: serialize(instance))
+
+    def update(self, request, *args, **kwargs):
+        """
+        Same as the default update, but the response loads contributors and issues
+        with their users in a few queries instead of one per issue.
+        """
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=kwargs.pop("partial", False))
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        self.prefetch_instance(serializer.instance)
+        return Response(serializer.data)
 
     def get_permissions(self):
 
@@ -40,6 +113,8 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
             "update": [IsAuthorOrReadOnly()],
             "destroy": [IsAuthorOrReadOnly()],
             "partial_update": [IsAuthorOrReadOnly()],
+            "export": [IsProjectContributor()],
+            "stats": [IsProjectContributor()],
             "add_contributors": [IsAuthorOrReadOnly()],
             "remove_contributors": [IsAuthorOrReadOnly()],
         }
@@ -64,38 +139,111 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
         if not user or not user.is_authenticated:
             return Response({"error": "Vous devez être authentifié."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Save project with the validated data, setting the author correctly
-        project = serializer.save(author=user)
-
-        # Add the author as a contributor
-        ProjectContributor.objects.create(project=project, user=user)
-
-        # Add additional contributors
-        added_users = []
-        for username in contributors_data:
-            try:
-                contributor = get_user_model().objects.get(username=username)
-                if not ProjectContributor.objects.filter(project=project, user=contributor).exists():
-                    ProjectContributor.objects.create(project=project, user=contributor)
-                    added_users.append(username)
-            except get_user_model().DoesNotExist:
+        if not isinstance(contributors_data, list):
+            return Response(
+                {"error": "Les contributeurs doivent être une liste de noms d'utilisateur."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            # Save project with the validated data, setting the author correctly
+            project = serializer.save(author=user)
+
+            # Add the author and the additional contributors
+            report = add_contributors(project, contributors_data, include_author=True)
+            missing_users = [username for username, result in report.items() if result == NOT_FOUND]
+            if missing_users:
+                transaction.set_rollback(True)
                 return Response(
-                    {"error": f"L'utilisateur '{username}' n'existe pas."}, status=status.HTTP_404_NOT_FOUND
+                    {
+                        "error": f"Utilisateur(s) inexistant(s) : {', '.join(missing_users)}.",
+                        "message": "Le projet n'a pas été créé.",
+                        "results": report,
+                    },
+                    status=status.HTTP_404_NOT_FOUND,
                 )
 
+        prefetch_related_objects([project], contributors_prefetch(), issues_prefetch())
         return Response(
             {
                 "message": "Le projet a bien été créé",
                 "project": ProjectSerializer(project).data,
-                "added_contributors": added_users,
+                "added_contributors": [username for username, result in report.items() if result == ADDED],
+                "results": report,
             },
             status=status.HTTP_201_CREATED,
         )
 
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """
+        Custom action streaming all the issues and comments of the project, in constant memory.
+        Query parameters:
+            output: "ndjson" (default) or "csv"
+        """
+        project = self.get_object()
+
+        output_format = request.query_params.get("output", "ndjson")
+        if output_format not in export.FORMATS:
+            return Response(
+                {"detail": "Format invalide. Choisissez parmis: ndjson, csv."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        content_type = "text/csv" if output_format == "csv" else "application/x-ndjson"
+        response = StreamingHttpResponse(export.render(project, output_format), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="project-{project.id}.{output_format}"'
+        return response
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """
+        Custom action returning the number of issues of the project per status, priority, tag and assignee,
+        computed with one aggregate query and cached until the project's issues change.
+        """
+        project = self.get_object()
+        etag, last_modified = self.get_object_validators(project)
+        not_modified = self.get_not_modified_response(etag, last_modified)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+
+        histogram = projectstats.get_histograms([project])[project.id]
+        data = {"project": project.id, **projectstats.render(histogram)}
+        return self.set_validators(Response(data), etag, last_modified)
+
+    @action(detail=False, methods=["get"], url_path="stats")
+    def overall_stats(self, request):
+        """
+        Custom action returning the same counts as "stats" for all the projects the user can view.
+        """
+        projects = list(
+            Project.objects.filter(id__in=get_authorization(request).project_ids)
+            .only("id", "version", "updated_at")
+            .order_by("id")
+        )
+        last_modified = max((project.updated_at for project in projects), default=None)
+        etag = self.make_etag(*(f"{project.id}-{project.version}" for project in projects))
+        not_modified = self.get_not_modified_response(etag, None)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+
+        histograms = projectstats.get_histograms(projects)
+        data = {"projects": len(projects), **projectstats.render(projectstats.merge(histograms.values()))}
+        return self.set_validators(Response(data), etag, last_modified)
+
+    def _get_contributor_usernames(self, request):
+        """
+        Return the list of usernames sent in the request, or None if it is missing or malformed.
+        """
+        contributor_usernames = request.data.get("contributors", [])
+        if not contributor_usernames or not isinstance(contributor_usernames, list):
+            return None
+        return contributor_usernames
+
     @action(detail=True, methods=["post"])
     def add_contributors(self, request, pk=None):
         """
         Custom action to add contributors to an existing project.
+        Unknown usernames abort the whole request, each username gets a result in "results".
         Request format:
         {
             "contributors": ["username1", "username2"]
@@ -103,30 +251,29 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
         """
         project = self.get_object()
 
-        contributor_usernames = request.data.get("contributors", [])
+        contributor_usernames = self._get_contributor_usernames(request)
 
-        if not contributor_usernames:
+        if contributor_usernames is None:
             return Response({"error": "Vous n'avez pas fourni d'utilisateur."}, status=status.HTTP_400_BAD_REQUEST)
 
-        added_users = []
-        for username in contributor_usernames:
-            try:
-                user = get_user_model().objects.get(username=username)
-                if not ProjectContributor.objects.filter(project=project, user=user).exists():
-                    ProjectContributor.objects.create(project=project, user=user)
-                    added_users.append(username)
-            except get_user_model().DoesNotExist:
-                return Response(
-                    {
-                        "error": f"User '{username}' does not exist.",
-                        "message": f"{', '.join(added_users) + 'ont' if added_users else 'Aucun contributeurs n\'a'}"
-                        " été ajouté(s) au projet.",
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
+        report = add_contributors(project, contributor_usernames)
+        missing_users = [username for username, result in report.items() if result == NOT_FOUND]
+        if missing_users:
+            return Response(
+                {
+                    "error": f"Utilisateur(s) inexistant(s) : {', '.join(missing_users)}.",
+                    "message": "Aucun contributeur n'a été ajouté au projet.",
+                    "results": report,
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
         return Response(
-            {"message": "Contributeur(s) ajouté(s) avec succès.", "added_contributors": added_users},
+            {
+                "message": "Contributeur(s) ajouté(s) avec succès.",
+                "added_contributors": [username for username, result in report.items() if result == ADDED],
+                "results": report,
+            },
             status=status.HTTP_200_OK,
         )
 
@@ -134,6 +281,7 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
     def remove_contributors(self, request, pk=None):
         """
         Custom action to remove contributors from an existing project.
+        Unknown usernames abort the whole request, each username gets a result in "results".
         Request format:
         {
             "contributors": ["username1", "username2"]
@@ -141,58 +289,60 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
         """
         project = self.get_object()
 
-        contributor_usernames = request.data.get("contributors", [])
+        contributor_usernames = self._get_contributor_usernames(request)
 
-        if not contributor_usernames:
+        if contributor_usernames is None:
             return Response({"error": "Vous n'avez pas fourni d'utilisateur."}, status=status.HTTP_400_BAD_REQUEST)
 
-        removed_users = []
-        for username in contributor_usernames:
-            try:
-                user = get_user_model().objects.get(username=username)
-                contributor = ProjectContributor.objects.filter(project=project, user=user)
-
-                if contributor.exists():
-                    contributor.delete()
-                    removed_users.append(username)
-                else:
-                    return Response(
-                        {
-                            "error": f"L'utilisateur '{username}' n'est pas un contributeur.",
-                            "message": f"{', '.join(removed_users) + 'ont' if removed_users else 'Aucun contributeurs n\'a'}"
-                            " été retiré(s) du projet.",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-            except get_user_model().DoesNotExist:
-                return Response(
-                    {
-                        "error": f"L'utilisateur '{username}' n'existe pas.",
-                        "message": f"{', '.join(removed_users) + 'ont' if removed_users else 'Aucun contributeurs n\'a'}"
-                        " été retiré(s) du projet.",
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
+        report = remove_contributors(project, contributor_usernames)
+        missing_users = [username for username, result in report.items() if result == NOT_FOUND]
+        if missing_users:
+            return Response(
+                {
+                    "error": f"Utilisateur(s) inexistant(s) : {', '.join(missing_users)}.",
+                    "message": "Aucun contributeur n'a été retiré du projet.",
+                    "results": report,
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
         return Response(
-            {"message": "Le(s) contributeur(s) ont été retiré(s) du projet.", "removed_contributors": removed_users},
+            {
+                "message": "Le(s) contributeur(s) ont été retiré(s) du projet.",
+                "removed_contributors": [username for username, result in report.items() if result == REMOVED],
+                "results": report,
+            },
             status=status.HTTP_200_OK,
         )
 
 
-class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
+class IssueViewSet(AsyncReadMixin, ConditionalGetMixin, SparseFieldsetMixin, MultipleSerializerMixin, ModelViewSet):
     serializer_class = IssueListSerializer
     detail_serializer_class = IssueSerializer
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ("-created_at", "-id")
     permission_classes = [IsAuthenticated, IsAuthorOrReadOnly]
+    filter_backends = [QueryParameterFilter, OrderingFilter]
+    filter_fields = {
+        "project": "project",
+        "status": "status",
+        "priority": "priority",
+        "tag": "tag",
+        "assignee": "assignee__username",
+        "author": "author__username",
+    }
+    ordering_fields = ["id", "created_at", "updated_at", "title"]
+    ordering = ["id"]
+    max_batch_size = 1000
+    always_loaded_fields = ("updated_at",)
 
     def get_queryset(self):
         """
         Return only issues that belong to projects where the user is a contributor.
         """
         user = self.request.user
-        projects_list = get_viewable_projects(user)
-        return Issue.objects.filter(project__in=projects_list)
+        queryset = Issue.objects.filter(project__in=get_viewable_projects(user)).select_related("author", "assignee")
+        return self.sparse_queryset(queryset)
 
     def create(self, request, *args, **kwargs):
         """
@@ -213,9 +363,8 @@ class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
 
         project = serializer.validated_data["project"]
         user = request.user
-        contributors_list = check_contributors(project)
 
-        if user not in contributors_list and user != project.author:
+        if not get_authorization(request).can_view_project(project.id):
             return Response(
                 {"detail": "Seuls l'auteur ou les contributeurs du projet peuvent créer des issues."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -224,6 +373,173 @@ class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
         serializer.save(author=user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def batch(self, request):
+        """
+        Create and partially update many issues in one request and one transaction.
+        Items with an "id" update that issue (author only), the others create an issue.
+        If one item is invalid nothing is written, and each item gets a result in "results".
+        Request format:
+        [
+            {"title": "issue title", "description": "...", "project": 1, "tag": "BUG", "assignee": "username"},
+            {"id": 12, "status": "DONE"}
+        ]
+        """
+        items = request.data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response({"detail": "Veuillez fournir une liste d'issues."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_batch_size:
+            return Response(
+                {"detail": f"Une requête ne peut contenir plus de {self.max_batch_size} issues."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = request.user
+        authorization = get_authorization(request)
+        update_ids = {item["id"] for item in items if is_issue_id(item.get("id"))}
+        instances = self.get_queryset().select_related("project").in_bulk(list(update_ids))
+        project_ids = {issue.project_id for issue in instances.values()}
+        project_ids |= {item["project"] for item in items if isinstance(item.get("project"), int)}
+        usernames = {item["assignee"] for item in items if isinstance(item.get("assignee"), str)}
+        context = self.get_serializer_context()
+        context["prefetched"] = {
+            "project": Project.objects.in_bulk(project_ids),
+            "assignee": get_users_by_username(usernames),
+        }
+
+        results = []
+        valid_serializers = []
+        for index, item in enumerate(items):
+            if "id" in item:
+                if not is_issue_id(item["id"]):
+                    results.append({"index": index, "status": "error", "errors": {"id": "Id d'issue invalide."}})
+                    continue
+                instance = instances.get(item["id"])
+                if instance is None:
+                    results.append({"index": index, "status": "error", "errors": {"id": "Issue introuvable."}})
+                    continue
+                if instance.author_id != user.id:
+                    results.append(
+                        {"index": index, "status": "error", "errors": {"id": "Seul l'auteur peut modifier l'issue."}}
+                    )
+                    continue
+                serializer = IssueSerializer(instance, data=item, partial=True, context=context)
+            else:
+                serializer = IssueSerializer(data=item, context=context)
+
+            if not serializer.is_valid():
+                results.append({"index": index, "status": "error", "errors": serializer.errors})
+                continue
+            project = serializer.validated_data.get("project")
+            if project is not None and not authorization.can_view_project(project.id):
+                errors = {"project": "Seuls l'auteur ou les contributeurs du projet peuvent créer des issues."}
+                results.append({"index": index, "status": "error", "errors": errors})
+                continue
+            results.append({"index": index, "status": "updated" if serializer.instance else "created"})
+            valid_serializers.append(serializer)
+
+        if any(result["status"] == "error" for result in results):
+            for result in results:
+                if result["status"] != "error":
+                    result["status"] = "valid"
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        to_create = []
+        to_update = []
+        updated_fields = {"updated_at"}
+        now = timezone.now()
+        for serializer in valid_serializers:
+            if serializer.instance is None:
+                to_create.append(Issue(author=user, **serializer.validated_data))
+                continue
+            for field, value in serializer.validated_data.items():
+                setattr(serializer.instance, field, value)
+            serializer.instance.updated_at = now
+            updated_fields.update(serializer.validated_data)
+            to_update.append(serializer.instance)
+
+        with transaction.atomic():
+            created = iter(Issue.objects.bulk_create(to_create))
+            if to_update:
+                Issue.objects.bulk_update(to_update, fields=sorted(updated_fields))
+            # bulk writes do not send signals, the projects (including the ones issues moved from) are touched
+            # and their issue counters updated here.
+            touch_projects(
+                [issue.project_id for issue in to_create + to_update]
+                + [issue._loaded_project_id for issue in to_update]
+            )
+            deltas = counters.issue_moves(to_update)
+            deltas.update((issue.project_id, issue.status) for issue in to_create)
+            counters.update_issue_counts(deltas)
+
+        for result, serializer in zip(results, valid_serializers):
+            issue = serializer.instance if serializer.instance is not None else next(created)
+            result["issue"] = IssueSerializer(issue).data
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def bulk_status(self, request):
+        """
+        Custom action to move many issues to a new status with a single UPDATE.
+        Only the issues the user can view and is the assignee or the author of are changed,
+        the other ids are reported as refused.
+        Request format:
+        {
+            "ids": [1, 2, 3],
+            "status": "TODO" / "IN_PROGRESS" / "DONE"
+        }
+        """
+        issue_ids = request.data.get("ids")
+        new_status = request.data.get("status")
+
+        if (
+            not isinstance(issue_ids, list)
+            or not issue_ids
+            or not all(is_issue_id(issue_id) for issue_id in issue_ids)
+        ):
+            return Response(
+                {"detail": "Veuillez fournir une liste d'ids d'issues."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(issue_ids) > self.max_batch_size:
+            return Response(
+                {"detail": f"Une requête ne peut contenir plus de {self.max_batch_size} issues."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if new_status not in dict(Issue.STATUS_CHOICES):
+            return Response(
+                {"detail": "Status invalide. Choisissez parmis: TODO, IN_PROGRESS, DONE."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = request.user
+        allowed = Issue.objects.filter(
+            Q(assignee=user) | Q(author=user), id__in=issue_ids, project__in=get_viewable_projects(user)
+        )
+        with transaction.atomic():
+            rows = allowed.values_list("id", "status", "project_id")
+            statuses = {issue_id: current for issue_id, current, _ in rows}
+            updated_ids = sorted(issue_id for issue_id, current in statuses.items() if current != new_status)
+            if updated_ids:
+                Issue.objects.filter(id__in=updated_ids).update(status=new_status, updated_at=timezone.now())
+                touch_projects({project_id for issue_id, current, project_id in rows if current != new_status})
+                deltas = Counter()
+                for _, current, project_id in rows:
+                    if current != new_status:
+                        deltas[(project_id, current)] -= 1
+                        deltas[(project_id, new_status)] += 1
+                counters.update_issue_counts(deltas)
+
+        return Response(
+            {
+                "status": new_status,
+                "updated": updated_ids,
+                "unchanged": sorted(issue_id for issue_id, current in statuses.items() if current == new_status),
+                "refused": sorted(set(issue_ids) - set(statuses)),
+            },
+            status=status.HTTP_200_OK,
+        )
+
     @action(detail=True, methods=["patch"], permission_classes=[IsAuthenticated])
     def update_status(self, request, pk=None):
         """
@@ -234,7 +550,7 @@ class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
         except Issue.DoesNotExist:
             return Response({"detail": "Issue not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if request.user not in [issue.assignee, issue.author]:
+        if request.user.id not in (issue.assignee_id, issue.author_id):
             return Response(
                 {"detail": "Seuls l'assignee ou l'auteur peuvent modifier le status."}, status=status.HTTP_403_FORBIDDEN
             )
@@ -253,20 +569,29 @@ class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
         return Response({"status": issue.status}, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(MultipleSerializerMixin, ModelViewSet):
+class CommentViewSet(AsyncReadMixin, ConditionalGetMixin, SparseFieldsetMixin, MultipleSerializerMixin, ModelViewSet):
     serializer_class = CommentListSerializer
     detail_serializer_class = CommentSerializer
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ("-created_at", "-id")
     permission_classes = [IsAuthenticated, IsAuthorOrReadOnly]
+    filter_backends = [QueryParameterFilter, OrderingFilter]
+    filter_fields = {
+        "project": "issue__project",
+        "issue": "issue",
+        "author": "author__username",
+    }
+    ordering_fields = ["created_at"]
+    ordering = ["created_at"]
+    always_loaded_fields = ("updated_at",)
 
     def get_queryset(self):
         """
         Return only comments that belong to issues in projects where the user is a contributor.
         """
         user = self.request.user
-        projects_list = get_viewable_projects(user)
-        viewable_issues = Issue.objects.filter(project__in=projects_list)
-
-        return Comment.objects.filter(issue__in=viewable_issues)
+        queryset = Comment.objects.filter(issue__project__in=get_viewable_projects(user)).select_related("author")
+        return self.sparse_queryset(queryset)
 
     def create(self, request, *args, **kwargs):
         """
@@ -282,10 +607,7 @@ class CommentViewSet(MultipleSerializerMixin, ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         issue = serializer.validated_data["issue"]
-        project = issue.project
-        contributors_list = check_contributors(project)
-
-        if request.user not in contributors_list:
+        if not get_authorization(request).can_view_project(issue.project_id):
             return Response(
                 {"detail": "Seuls l'auteur ou les contributeurs du projet peuvent créer des commentaires."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -293,3 +615,57 @@ class CommentViewSet(MultipleSerializerMixin, ModelViewSet):
 
         serializer.save(author=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SearchViewSet(ViewSet):
+    """
+    Full-text search over the issues and comments of the projects the user can view.
+    Query parameters:
+        q: words to search (all of them must match)
+        type: "issue" or "comment" (both by default)
+        limit: maximum number of results (20 by default, 100 at most)
+    Results from both indexes are merged on their normalised score (see search.add_scores).
+    """
+
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def list(self, request):
+        if not search.is_available():
+            return Response(
+                {"detail": "La recherche n'est pas disponible sur cette base de données."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response(
+                {"detail": "Veuillez fournir un texte à rechercher (q)."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result_type = request.query_params.get("type")
+        if result_type not in (None, "issue", "comment"):
+            return Response(
+                {"detail": "Type invalide. Choisissez parmis: issue, comment."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = None
+        if limit is None or limit < 1:
+            return Response(
+                {"detail": "La limite doit être un entier positif."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(limit, self.max_limit)
+
+        results = []
+        if result_type in (None, "issue"):
+            results += search.search_issues(request.user, text, limit)
+        if result_type in (None, "comment"):
+            results += search.search_comments(request.user, text, limit)
+        # bm25 ranks of the two indexes are not comparable, their normalised scores are.
+        results.sort(key=lambda result: -result["score"])
+
+        return Response({"count": len(results[:limit]), "results": results[:limit]}, status=status.HTTP_200_OK)
@@ -0,0 +1,22 @@
+"""
+URL configuration of the ASGI profile (settings_asgi): the same urls as softdesk.urls, with the list
+and detail GET of projects, issues and comments served by their async views.
+"""
+
+from django.urls import URLPattern, include, path
+from projectsmanagement.asyncviews import async_read_view
+from .urls import router, urlpatterns as sync_urlpatterns
+
+ASYNC_BASENAMES = {"projects", "issues", "comments"}
+
+
+def with_async_reads(pattern):
+    basename, _, route = pattern.name.rpartition("-")
+    if basename not in ASYNC_BASENAMES or route not in ("list", "detail"):
+        return pattern
+    return URLPattern(pattern.pattern, async_read_view(pattern.callback), pattern.default_args, pattern.name)
+
+
+urlpatterns = [pattern for pattern in sync_urlpatterns if str(pattern.pattern) != "api/"] + [
+    path(r"api/", include([with_async_reads(pattern) for pattern in router.urls])),
+]
@@ -0,0 +1,62 @@
+"""
+Hit/miss counters of the cache layers, shared by the authentication and projectsmanagement apps.
+The counters of each layer are registered under a name, for the periodic log line of
+QueryInstrumentationMiddleware and the benchmark report.
+"""
+
+import threading
+
+
+class CacheStats:
+    """
+    Thread-safe hit/miss counters for a cache layer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_registry = {}
+
+
+def register(name, stats):
+    """
+    Register the counters of a cache layer under a name, and return them.
+    """
+    _registry[name] = stats
+    return stats
+
+
+def snapshot():
+    """
+    {name: counters} of every registered cache layer.
+    """
+    return {name: stats.as_dict() for name, stats in sorted(_registry.items())}
+
+
+def reset_all():
+    for stats in _registry.values():
+        stats.reset()
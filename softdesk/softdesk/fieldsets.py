@@ -0,0 +1,128 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+def parse_fieldset(query_params, available):
+    """
+    Return the names of the fields kept by ``?fields=a,b`` (all by default) minus the ones removed by
+    ``?exclude=c``, among the available ones, or None when neither parameter is given.
+    Unknown names raise a ValidationError (400).
+    """
+    selected = {}
+    errors = {}
+    for param in (FIELDS_PARAM, EXCLUDE_PARAM):
+        raw_value = query_params.get(param)
+        if not raw_value:
+            continue
+        names = {name.strip() for name in raw_value.split(",") if name.strip()}
+        unknown = sorted(names - set(available))
+        if unknown:
+            errors[param] = [f"Champ(s) inconnu(s) : {', '.join(unknown)}. Choisissez parmis: {', '.join(available)}."]
+        selected[param] = names
+
+    if errors:
+        raise ValidationError(errors)
+    if not selected:
+        return None
+    return frozenset(selected.get(FIELDS_PARAM, set(available)) - selected.get(EXCLUDE_PARAM, set()))
+
+
+def serializer_sources(serializer):
+    """
+    Names of the model attributes the fields of the serializer read: the first part of their source,
+    the field name for a SerializerMethodField, or the fields listed in ``Meta.field_dependencies``
+    for the ones computed from other fields (properties).
+    """
+    dependencies = getattr(serializer.Meta, "field_dependencies", {})
+    sources = set()
+    for name, field in serializer.fields.items():
+        if name in dependencies:
+            sources.update(dependencies[name])
+        else:
+            sources.add(name if field.source == "*" else field.source.split(".")[0])
+    return sources
+
+
+def load_only(queryset, serializer, always=()):
+    """
+    Restrict the queryset to what the serializer reads, plus the "always" loaded fields: ``.only()``
+    on the concrete fields, and the select_related relations and prefetches no field reads dropped.
+    """
+    model = queryset.model
+    columns = {model._meta.pk.name}
+    relations = set()
+    for name in serializer_sources(serializer) | set(always):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete:
+            columns.add(name)
+        else:
+            relations.add(name)
+
+    if isinstance(queryset.query.select_related, dict):
+        related = [name for name in queryset.query.select_related if name in columns]
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+    prefetches = [
+        lookup
+        for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, "prefetch_to", lookup).split("__")[0] in relations
+    ]
+    return queryset.prefetch_related(None).prefetch_related(*prefetches).only(*columns)
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serialize only the fields of ``context["fieldset"]`` when the serializer is the root one
+    (or the child of a root list); nested serializers keep all their fields.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get("fieldset")
+        parent = getattr(self, "parent", None)
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if fieldset is None or parent is not None:
+            return fields
+        return {name: field for name, field in fields.items() if name in fieldset}
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=`` / ``?exclude=`` on the list and retrieve actions of a viewset: the serializer outputs
+    only the selected fields and ``sparse_queryset`` loads only what they read. ``always_loaded_fields``
+    are the model fields the permissions and validators read whatever the fieldset; relations loaded
+    by hand are checked with ``wants``.
+    """
+
+    sparse_actions = ("list", "retrieve")
+    always_loaded_fields = ()
+
+    def get_fieldset(self):
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = parse_fieldset(self.request.query_params, self.get_serializer_class().Meta.fields)
+        return self._fieldset
+
+    def wants(self, field):
+        fieldset = self.get_fieldset()
+        return fieldset is None or field in fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = self.get_fieldset()
+        return context
+
+    def sparse_queryset(self, queryset):
+        if self.get_fieldset() is None:
+            return queryset
+        return load_only(queryset, self.get_serializer(), always=self.always_loaded_fields)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 import django
 from django.utils.encoding import smart_str
@@ -54,13 +55,16 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("authentication.authentication.CachedJWTAuthentication",),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Tokens carry the username, the staff flag and the token version of the user (revoked by change_password).
+    "TOKEN_OBTAIN_SERIALIZER": "authentication.serializers.VersionedTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "authentication.serializers.VersionedTokenRefreshSerializer",
 }
 
 MIDDLEWARE = [
@@ -71,6 +75,9 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Before the SQL instrumentation, which doesn't count its user lookup.
+    "projectsmanagement.profiling.ProfilingMiddleware",
+    "projectsmanagement.instrumentation.QueryInstrumentationMiddleware",
 ]
 
 ROOT_URLCONF = "softdesk.urls"
@@ -104,6 +111,160 @@ DATABASES = {
     }
 }
 
+# SQLite profiles, selected with the SOFTDESK_DB_PROFILE environment variable ("default" or "production").
+# PRAGMAS are run on every new connection (projectsmanagement.sqlite.configure_connection), OPTIONS go
+# to the database OPTIONS. Maintain the database with "python manage.py sqlite_maintenance".
+SQLITE_PROFILES = {
+    "default": {
+        "PRAGMAS": {"journal_mode": "DELETE", "synchronous": "FULL"},
+        "OPTIONS": {},
+        "CONN_MAX_AGE": 0,
+    },
+    "production": {
+        # WAL lets readers run during a write; synchronous=NORMAL only syncs at checkpoints, committed
+        # transactions survive a crash of the process (not of the machine).
+        "PRAGMAS": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -64000,
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": "MEMORY",
+        },
+        # Writers take the lock when their transaction begins, and wait for it up to busy_timeout.
+        # A deferred transaction upgrading to a write fails with "database is locked" without waiting.
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        "CONN_MAX_AGE": 600,
+    },
+}
+DATABASE_PROFILE = os.environ.get("SOFTDESK_DB_PROFILE", "default")
+SQLITE_PRAGMAS = SQLITE_PROFILES[DATABASE_PROFILE]["PRAGMAS"]
+DATABASES["default"]["OPTIONS"] = dict(SQLITE_PROFILES[DATABASE_PROFILE]["OPTIONS"])
+DATABASES["default"]["CONN_MAX_AGE"] = SQLITE_PROFILES[DATABASE_PROFILE]["CONN_MAX_AGE"]
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "softdesk",
+    },
+    # Serialized responses; the local-memory backend evicts the least recently used entries past MAX_ENTRIES.
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "softdesk-responses",
+        "OPTIONS": {"MAX_ENTRIES": 1000, "CULL_FREQUENCY": 4},
+    },
+    # Users by id and by username (two entries per user), bounded like the responses.
+    "users": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "softdesk-users",
+        "OPTIONS": {"MAX_ENTRIES": 2000, "CULL_FREQUENCY": 4},
+    },
+}
+# A Redis server shared by the workers, e.g. redis://127.0.0.1:6379/1 (requires the redis package).
+if os.environ.get("SOFTDESK_CACHE_URL"):
+    CACHES["shared"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["SOFTDESK_CACHE_URL"],
+    }
+
+# Membership sets (projects per user, members per project) are invalidated by signals, in the process
+# that made the change. With a shared cache, the timeout only bounds how long an entry missed by an
+# out-of-band write can live. The local-memory cache of the other workers isn't invalidated: entries
+# there only live MEMBERSHIP_LOCAL_CACHE_TIMEOUT seconds, and the production profile requires a shared
+# cache (check projectsmanagement.E001).
+MEMBERSHIP_CACHE_ALIAS = "shared" if "shared" in CACHES else "default"
+MEMBERSHIP_CACHE_TIMEOUT = 300
+MEMBERSHIP_LOCAL_CACHE_TIMEOUT = 5
+
+# Users looked up by the JWT authentication and by username (serializers, contributors),
+# invalidated on save and delete of the user.
+USER_CACHE_ALIAS = "users"
+USER_CACHE_TIMEOUT = 300
+
+# Project detail responses are keyed by the project version, bumped on every change of the project,
+# its contributors or its issues.
+PROJECT_DETAIL_CACHE = {
+    "ENABLED": True,
+    "ALIAS": "responses",
+    "TIMEOUT": 300,
+}
+
+# Issue histograms of the stats actions, keyed by the project version like the details.
+PROJECT_STATS_CACHE = {
+    "ENABLED": True,
+    "ALIAS": "responses",
+    "TIMEOUT": 300,
+}
+
+# Per-request SQL metrics (QueryInstrumentationMiddleware). Requests over the budget of their view
+# ("<ViewSet>.<action>", on top of DEFAULT_BUDGET) are logged on the "softdesk.sql" logger.
+# Query counts include a user cache miss of the JWT authentication and a membership cache miss,
+# and issue and comment writes the updates of the denormalized counters.
+SQL_INSTRUMENTATION = {
+    "ENABLED": True,
+    "SERVER_TIMING": DEBUG,
+    "DEFAULT_BUDGET": {"queries": 10, "duplicates": 0, "db_time_ms": 250},
+    # Log the hit/miss counters of the cache layers every 1000 requests, in DEBUG only (0 disables the line).
+    # The benchmark reports read the counters directly.
+    "CACHE_STATS_EVERY": 1000 if DEBUG else 0,
+    "BUDGETS": {
+        "UserViewSet.list": {"queries": 3},
+        # The user viewing their own profile is loaded by the authentication and by get_object.
+        "UserViewSet.retrieve": {"queries": 2, "duplicates": 1},
+        "UserViewSet.change_password": {"queries": 3, "duplicates": 1},
+        "ProjectViewSet.list": {"queries": 5},
+        "ProjectViewSet.retrieve": {"queries": 5},
+        "ProjectViewSet.create": {"queries": 11},
+        "ProjectViewSet.update": {"queries": 5},
+        "ProjectViewSet.partial_update": {"queries": 5},
+        "ProjectViewSet.destroy": {"queries": 9},
+        "ProjectViewSet.export": {"queries": 3},
+        "ProjectViewSet.stats": {"queries": 5},
+        "ProjectViewSet.overall_stats": {"queries": 5},
+        "ProjectViewSet.add_contributors": {"queries": 7},
+        "ProjectViewSet.remove_contributors": {"queries": 9},
+        "IssueViewSet.list": {"queries": 3},
+        "IssueViewSet.retrieve": {"queries": 2},
+        "IssueViewSet.create": {"queries": 6},
+        "IssueViewSet.update": {"queries": 5},
+        "IssueViewSet.partial_update": {"queries": 5},
+        "IssueViewSet.destroy": {"queries": 6},
+        "IssueViewSet.update_status": {"queries": 5},
+        "IssueViewSet.batch": {"queries": 11},
+        "IssueViewSet.bulk_status": {"queries": 7},
+        "CommentViewSet.list": {"queries": 3},
+        "CommentViewSet.retrieve": {"queries": 2},
+        "CommentViewSet.create": {"queries": 6},
+        "CommentViewSet.update": {"queries": 3},
+        "CommentViewSet.partial_update": {"queries": 3},
+        "CommentViewSet.destroy": {"queries": 5},
+        "SearchViewSet.list": {"queries": 3},
+    },
+}
+
+# cProfile of single requests, asked by staff users with the "X-Profile: 1" header or "?profile=1",
+# for SAMPLE_RATE of those requests, in DEBUG only. List and read them with "python manage.py profiles".
+PROFILING = {
+    "ENABLED": DEBUG,
+    "DIRECTORY": BASE_DIR / "profiles",
+    "SAMPLE_RATE": 1.0,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "softdesk.sql": {"handlers": ["console"], "level": "WARNING"},
+        "softdesk.cache": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
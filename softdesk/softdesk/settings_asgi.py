@@ -0,0 +1,16 @@
+"""
+ASGI deployment profile, used by softdesk/asgi.py:
+
+    uvicorn softdesk.asgi:application --workers 4
+
+Project, issue and comment list/retrieve requests are served by async views (see softdesk/asgi_urls.py),
+so a request waiting on the database doesn't hold a worker thread.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = "softdesk.asgi_urls"
+
+# Async views run their queries in a thread per request: persistent connections would be
+# opened per thread and never reused, so they are closed after each request, whatever the SQLite profile.
+DATABASES = {**DATABASES, "default": {**DATABASES["default"], "CONN_MAX_AGE": 0}}
@@ -3,7 +3,7 @@ from django.urls import path, include
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from authentication.views import UserViewSet, RegisterView
-from projectsmanagement.views import ProjectViewSet, CommentViewSet, IssueViewSet
+from projectsmanagement.views import ProjectViewSet, CommentViewSet, IssueViewSet, SearchViewSet
 
 
 router = routers.SimpleRouter()
@@ -11,6 +11,7 @@ router.register(r"users", UserViewSet, basename="users")
 router.register(r"projects", ProjectViewSet, basename="projects")
 router.register(r"issues", IssueViewSet, basename="issues")
 router.register(r"comments", CommentViewSet, basename="comments")
+router.register(r"search", SearchViewSet, basename="search")
 
 
 urlpatterns = [